@@ -3,7 +3,7 @@ import uuid
 import logging
 from contextlib import asynccontextmanager
 
-from fastapi import FastAPI, Request, Response
+from fastapi import FastAPI
 
 from app.resources.address_router import address_router
 from app.resources.address_user_router import address_user_router
@@ -19,47 +19,64 @@ from app.resources.message_thread_router import thread_router
 from app.resources.message_router import message_router
 from app.resources.image_router import image_router
 
-from app.utils.config import init_env
+from app.services.category_service import start_category_cache
+from app.services.image_service import shutdown_compress_pool, start_compress_workers
+from app.services.item_summary_service import start_item_read_model
+from app.utils.auth import load_jwt_secret
+from app.utils.config import init_env, close_http_clients, get_item_client, get_user_client
 from app.utils.db_connection import create_db_and_tables, close_db_connection
 
 from fastapi.middleware.cors import CORSMiddleware
 from app.middleware.auth_middleware import AuthMiddleware
-from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
 # Table Models (Necessary)
 from app.models.po.address_user_po import AddressUser
 from app.models.po.item_address_po import ItemAddress
 from app.models.po.item_user_po import ItemUser
+from app.models.po.item_summary_po import ItemSummary
+from app.models.po.read_model_backfill_po import ReadModelBackfill
 from app.models.po.transaction_user_item_po import TransactionUserItem
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger("composite_api")
 
-class CorrelationIdMiddleware(BaseHTTPMiddleware):
-    async def dispatch(self, request: Request, call_next):
-        corr_id = request.headers.get("X-Correlation-ID", str(uuid.uuid4()))
-        request.state.correlation_id = corr_id
+class CorrelationIdMiddleware:
+    """Pure ASGI middleware propagating X-Correlation-ID and logging each request"""
 
-        logger.info(
-            "Composite incoming %s %s (correlation_id=%s)",
-            request.method,
-            request.url.path,
-            corr_id,
-        )
+    def __init__(self, app: ASGIApp):
+        self.app = app
 
-        response: Response = await call_next(request)
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
 
-        response.headers["X-Correlation-ID"] = corr_id
+        corr_id = Headers(scope=scope).get("X-Correlation-ID", str(uuid.uuid4()))
+        scope.setdefault("state", {})["correlation_id"] = corr_id
+        method, path = scope["method"], scope["path"]
 
         logger.info(
-            "Composite outgoing %s %s status=%s (correlation_id=%s)",
-            request.method,
-            request.url.path,
-            response.status_code,
+            "Composite incoming %s %s (correlation_id=%s)",
+            method,
+            path,
             corr_id,
         )
 
-        return response
+        async def send_with_correlation_id(message: Message):
+            if message["type"] == "http.response.start":
+                MutableHeaders(scope=message)["X-Correlation-ID"] = corr_id
+                logger.info(
+                    "Composite outgoing %s %s status=%s (correlation_id=%s)",
+                    method,
+                    path,
+                    message["status"],
+                    corr_id,
+                )
+            await send(message)
+
+        await self.app(scope, receive, send_with_correlation_id)
 
 # -----------------------------------------------------------------------------
 # Environments and Clients
@@ -72,16 +89,27 @@ init_env()
 # -----------------------------------------------------------------------------
 @asynccontextmanager
 async def lifespan(app: FastAPI):
+    load_jwt_secret()
+
     # Startup: Create tables
     print("Creating database tables...")
     await create_db_and_tables()
     print("Database tables created successfully!")
+    category_refresh = await start_category_cache(get_item_client())
+    backfill = start_item_read_model(get_item_client(), get_user_client())
+    start_compress_workers()
 
     yield
 
     # Shutdown: cleanup
+    category_refresh.cancel()
+    if backfill is not None:
+        backfill.cancel()
     print("Closing database connection...")
     await close_db_connection()
+    print("Closing downstream HTTP clients...")
+    await close_http_clients()
+    shutdown_compress_pool()
     print("Shutdown complete!")
 
 
@@ -1,42 +1,51 @@
 from __future__ import annotations
 
-import os
-from typing import Callable, Iterable, Awaitable
+from typing import Iterable
 
-from fastapi import Request, Response
 from fastapi.responses import JSONResponse
-from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.datastructures import Headers
+from starlette.types import ASGIApp, Receive, Scope, Send
 
 from app.utils.auth import get_user_id_from_token
 
 
-class AuthMiddleware(BaseHTTPMiddleware):
+class AuthMiddleware:
+    """
+    Pure ASGI middleware: requests under a protected prefix need a valid bearer token,
+    whose user id is exposed as request.state.user_id.
+    """
+
     def __init__(
         self,
-        app,
+        app: ASGIApp,
         protected_prefixes: Iterable[str] | None = None,
     ):
-        super().__init__(app)
-        self.protected_prefixes = list(protected_prefixes)
-
-    async def dispatch(self, request: Request, call_next: Callable[[Request], Awaitable[Response]]):
-        if request.method == "OPTIONS":
-            return await call_next(request)
+        self.app = app
+        self.protected_prefixes = tuple(protected_prefixes)
 
-        path = request.url.path
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http" or scope["method"] == "OPTIONS":
+            await self.app(scope, receive, send)
+            return
 
-        if not any(path.startswith(prefix) for prefix in self.protected_prefixes):
-            return await call_next(request)
+        if not scope["path"].startswith(self.protected_prefixes):
+            await self.app(scope, receive, send)
+            return
 
-        auth_header = request.headers.get("Authorization", "")
+        auth_header = Headers(scope=scope).get("Authorization", "")
         scheme, _, token = auth_header.partition(" ")
         if scheme.lower() != "bearer" or not token:
-            return JSONResponse(status_code=401, content={"detail": "Not authenticated"})
+            response = JSONResponse(status_code=401, content={"detail": "Not authenticated"})
+            await response(scope, receive, send)
+            return
 
         try:
             user_id = get_user_id_from_token(token)
-            request.state.user_id = user_id
         except Exception:
-            return JSONResponse(status_code=403, content={"detail": "Invalid or expired token"})
+            response = JSONResponse(status_code=403, content={"detail": "Invalid or expired token"})
+            await response(scope, receive, send)
+            return
 
-        return await call_next(request)
+        # Backs request.state for the handlers
+        scope.setdefault("state", {})["user_id"] = user_id
+        await self.app(scope, receive, send)
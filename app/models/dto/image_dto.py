@@ -1,4 +1,6 @@
-from pydantic import BaseModel
+from typing import Dict, List
+
+from pydantic import BaseModel, Field
 
 class UploadSuccessResponse(BaseModel):
     status: str
@@ -6,4 +8,11 @@ class UploadSuccessResponse(BaseModel):
     message: str
 
 class ImageUrlResponse(BaseModel):
-    url: str
\ No newline at end of file
+    url: str
+
+# Galleries resolve all their images in one request
+class ImageUrlsRequest(BaseModel):
+    filenames: List[str] = Field(..., max_length=100)
+
+class ImageUrlsResponse(BaseModel):
+    urls: Dict[str, str]
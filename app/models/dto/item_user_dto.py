@@ -2,7 +2,7 @@ from pydantic import BaseModel, Field, ConfigDict, field_validator
 from typing import Any, Dict, List, Optional
 from uuid import UUID
 
-from .item_dto import ItemBase, ConditionType, TransactionType
+from .item_dto import ItemBase, ItemRead, ConditionType, TransactionType
 
 
 class CreateOwnItemReq(ItemBase):
@@ -24,3 +24,8 @@ class UpdateOwnItemReq(BaseModel):
     category_ids: Optional[List[int]] = None
     address_UUID: Optional[UUID] = None
     image_urls: Optional[List[str]] = None
+
+
+class ItemPageRes(BaseModel):
+    items: List[ItemRead]
+    next_cursor: Optional[str] = None
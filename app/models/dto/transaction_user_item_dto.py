@@ -1,5 +1,5 @@
 from pydantic import BaseModel
-from typing import Optional, Literal
+from typing import List, Optional, Literal
 from datetime import datetime
 
 
@@ -27,6 +27,11 @@ class TransactionRes(BaseModel):
     updated_at: datetime
 
 
+class TransactionPageRes(BaseModel):
+    items: List[TransactionRes]
+    next_cursor: Optional[str] = None
+
+
 class UpdateTransactionStatusReq(BaseModel):
     status: Literal["accepted", "rejected", "canceled", "completed"]
 
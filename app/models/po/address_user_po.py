@@ -1,3 +1,4 @@
+from sqlalchemy import Index
 from sqlmodel import SQLModel, Field
 from datetime import datetime
 from typing import Optional
@@ -5,6 +6,10 @@ from typing import Optional
 
 class AddressUser(SQLModel, table=True):
     __tablename__ = "address_user"
+    __table_args__ = (
+        Index("uq_address_user_address_user", "address_id", "user_id", unique=True),
+        Index("ix_address_user_user_created", "user_id", "created_at", "id"),
+    )
 
     id: Optional[int] = Field(default=None, primary_key=True)
     address_id: str = Field(index=True)
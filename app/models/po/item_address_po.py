@@ -1,3 +1,4 @@
+from sqlalchemy import Index
 from sqlmodel import SQLModel, Field
 from datetime import datetime
 from typing import Optional
@@ -5,6 +6,9 @@ from typing import Optional
 
 class ItemAddress(SQLModel, table=True):
     __tablename__ = "item_address"
+    __table_args__ = (
+        Index("uq_item_address_item_address", "item_id", "address_id", unique=True),
+    )
 
     id: Optional[int] = Field(default=None, primary_key=True)
     item_id: str = Field(index=True)
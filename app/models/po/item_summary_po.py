@@ -0,0 +1,34 @@
+from sqlalchemy import Column, Double, Index, JSON, Text
+from sqlmodel import SQLModel, Field
+from datetime import datetime
+from typing import Optional
+
+
+class ItemSummary(SQLModel, table=True):
+    """Local read-model of the item fields served by /items, kept in sync from item events"""
+    __tablename__ = "item_summary"
+    __table_args__ = (
+        Index("uq_item_summary_item", "item_id", unique=True),
+        Index("ix_item_summary_item_created", "item_created_at", "id"),
+        Index("ix_item_summary_type_created", "transaction_type", "item_created_at", "id"),
+    )
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    item_id: str
+    user_id: Optional[str] = Field(default=None, index=True)
+    # The item service doesn't limit titles or descriptions, and prices need more than FLOAT's 7 digits
+    title: str = Field(sa_column=Column(Text, nullable=False))
+    description: Optional[str] = Field(default=None, sa_column=Column(Text))
+    price: float = Field(sa_column=Column(Double, nullable=False))
+    condition: str
+    transaction_type: str
+    address_id: Optional[str] = None
+    address_city: Optional[str] = None
+    image_urls: Optional[list] = Field(default=None, sa_column=Column(JSON))
+    categories: Optional[list] = Field(default=None, sa_column=Column(JSON))
+    item_created_at: Optional[datetime] = None
+    # updated_at of the item in the item service, kept verbatim since it is the item's ETag
+    etag: Optional[str] = None
+    created_at: datetime = Field(default_factory=datetime.now)
+    # Last time the row was written or confirmed against the item service
+    updated_at: datetime = Field(default_factory=datetime.now)
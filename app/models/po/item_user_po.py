@@ -1,3 +1,4 @@
+from sqlalchemy import Index
 from sqlmodel import SQLModel, Field
 from datetime import datetime
 from typing import Optional
@@ -5,6 +6,10 @@ from typing import Optional
 
 class ItemUser(SQLModel, table=True):
     __tablename__ = "item_user"
+    __table_args__ = (
+        Index("uq_item_user_item_user", "item_id", "user_id", unique=True),
+        Index("ix_item_user_user_created", "user_id", "created_at", "id"),
+    )
 
     id: Optional[int] = Field(default=None, primary_key=True)
     item_id: str = Field(index=True)
@@ -0,0 +1,18 @@
+from sqlalchemy import Index
+from sqlmodel import SQLModel, Field
+from datetime import datetime
+from typing import Optional
+
+
+class ReadModelBackfill(SQLModel, table=True):
+    """Marks a read-model as copied, so only one instance ever backfills it"""
+    __tablename__ = "read_model_backfill"
+    __table_args__ = (
+        Index("uq_read_model_backfill_name", "name", unique=True),
+    )
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    name: str
+    # Refreshed after every page by the instance copying, a stale one is taken over
+    heartbeat_at: datetime = Field(default_factory=datetime.now)
+    completed_at: Optional[datetime] = None
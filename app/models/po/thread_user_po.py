@@ -1,9 +1,14 @@
+from sqlalchemy import Index
 from sqlmodel import SQLModel, Field
 from typing import Optional
 from datetime import datetime
 
 class ThreadUser(SQLModel, table=True):
     __tablename__ = "thread_user"
+    __table_args__ = (
+        Index("uq_thread_user_thread_user", "thread_id", "user_id", unique=True),
+        Index("ix_thread_user_user_created", "user_id", "created_at", "id"),
+    )
 
     id: Optional[int] = Field(default=None, primary_key=True)
     thread_id: str = Field(index=True)
@@ -1,3 +1,4 @@
+from sqlalchemy import Index
 from sqlmodel import SQLModel, Field
 from datetime import datetime
 from typing import Optional
@@ -5,6 +6,10 @@ from typing import Optional
 
 class TransactionUserItem(SQLModel, table=True):
     __tablename__ = "transaction_user_item"
+    __table_args__ = (
+        Index("ix_transaction_user_item_initiator_created", "initiator_user_id", "created_at", "id"),
+        Index("ix_transaction_user_item_receiver_created", "receiver_user_id", "created_at", "id"),
+    )
 
     id: Optional[int] = Field(default=None, primary_key=True)
     transaction_id: str = Field(index=True, unique=True)
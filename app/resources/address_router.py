@@ -2,6 +2,7 @@ from fastapi import APIRouter, HTTPException, Request
 from uuid import UUID
 
 from app.models.dto.address_dto import AddressDTO
+from app.services.address_service import invalidate_address
 from app.utils.config import get_address_client
 
 # Downstream Client Imports (Check your files for exact names)
@@ -43,6 +44,8 @@ async def update_address(
     if not result:
         raise HTTPException(status_code=500, detail="Failed to update address downstream")
 
+    invalidate_address(address_id)
+
     # 4. Return updated address
     return AddressDTO(
         id=result.id,
@@ -63,6 +66,7 @@ async def delete_address(
         client=get_address_client(),
         address_id=address_id
     )
-    
+    invalidate_address(address_id)
+
     return {"message": "Address deleted successfully"}
 
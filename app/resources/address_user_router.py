@@ -9,7 +9,8 @@ from app.client.user.user_address_api_client.api.default.create_address_addresse
 )
 from app.client.user.user_address_api_client.models.address_create import AddressCreate
 from app.models.dto.address_dto import AddressDTO
-from app.models.po.address_user_po import AddressUser  # Local relationship model
+from app.services.address_user_repository import create_address_user_relation
+from app.services.address_service import cache_address
 from app.utils.config import get_address_client
 from app.utils.db_connection import SessionDep
 
@@ -46,17 +47,17 @@ async def create_my_address(
 
     # 3. CRITICAL FIX: Link Address to User Locally
     try:
-        new_relation = AddressUser(
-            user_id=str(user_id),
-            address_id=str(result.id) 
+        await create_address_user_relation(
+            session=session,
+            address_id=str(result.id),
+            user_id=str(user_id)
         )
-        session.add(new_relation)
-        await session.commit()
-        await session.refresh(new_relation)
     except Exception as e:
         logging.error(f"Error linking address: {e}")
         raise HTTPException(status_code=500, detail="Failed to link address to user")
 
+    cache_address(result.id, result.to_dict())
+
     # 4. Return Result
     return AddressDTO(
         id=result.id,
@@ -1,6 +1,6 @@
 from httpx import Response
-from app.models.dto.image_dto import UploadSuccessResponse, ImageUrlResponse
-from app.services.image_service import upload_image, get_image_url
+from app.models.dto.image_dto import UploadSuccessResponse, ImageUrlResponse, ImageUrlsRequest
+from app.services.image_service import upload_image, get_image_url, get_image_urls, get_local_image
 from fastapi import APIRouter, UploadFile, File, HTTPException, Form
 from typing import Annotated
 import logging
@@ -33,6 +33,14 @@ async def upload_image_endpoint(file: UploadFile = File(...), fcm_token: Annotat
     
     return result
 
+@image_router.post("/image/urls")
+async def get_image_urls_endpoint(request: ImageUrlsRequest):
+    return await get_image_urls(request.filenames)
+
+@image_router.get("/image/file/{filename}")
+async def get_local_image_endpoint(filename: str, expires: int, signature: str):
+    return await get_local_image(filename, expires, signature)
+
 @image_router.get("/image/{filename}")
 async def get_image_url_endpoint(filename: str):
     return await get_image_url(filename)
\ No newline at end of file
@@ -1,15 +1,12 @@
 import logging
-from fastapi import APIRouter, Depends, status, Query, Response
+from fastapi import APIRouter, Depends, Request, status, Query, Response
 from fastapi.exceptions import HTTPException
 from typing import List, Optional
 from uuid import UUID
-import asyncio
 
 from app.client.item.item_api_client.client import Client
 from app.client.item.item_api_client.api.items import (
     list_items_items_get,
-    get_item_items_item_id_get,
-    list_categories_items_categories_get
 )
 from app.client.item.item_api_client.models import HTTPValidationError
 from app.models.dto.item_dto import (
@@ -19,8 +16,15 @@ from app.models.dto.item_dto import (
 )
 from app.utils.config import get_item_client, get_user_client
 from app.utils.db_connection import SessionDep
-from app.services.item_service import complete_item
-from app.services.item_user_repository import get_item_owners_batch, get_item_owner
+from app.utils.etag import compute_etag, conditional_get
+from app.services.category_service import ensure_categories, get_categories_etag, get_categories_page
+from app.services.item_service import complete_item, complete_items
+from app.services.item_summary_service import (
+    get_item_with_owner,
+    list_items_from_read_model,
+    summary_to_item_dict,
+)
+from app.services.item_user_repository import get_item_owners_batch
 
 
 log = logging.getLogger(__name__)
@@ -37,6 +41,8 @@ item_router = APIRouter(
     summary="Get all items through pagination.",
 )
 async def list_public_items(
+    request: Request,
+    response: Response,
     session: SessionDep,
     item_ids: Optional[List[UUID]] = Query(
         None, alias="id", description="Filter by a list of item IDs"
@@ -56,6 +62,28 @@ async def list_public_items(
     """
     Get items through pagination, can be filtered by ID, category, condition, transaction type
     """
+    summaries = await list_items_from_read_model(
+        session,
+        client_item,
+        client_user,
+        item_ids=item_ids,
+        category_id=category_id,
+        transaction_type=transaction_type,
+        search=search,
+        skip=skip,
+        limit=limit,
+    )
+    if summaries is not None:
+        result_items = await complete_items(
+            [summary_to_item_dict(summary) for summary in summaries],
+            [summary.user_id for summary in summaries],
+            client_user
+        )
+        not_modified = conditional_get(request, response, _items_etag(result_items))
+        if not_modified:
+            return not_modified
+        return result_items
+
     item_response = await list_items_items_get.asyncio(
         client=client_item,
         id=item_ids,
@@ -86,37 +114,50 @@ async def list_public_items(
     item_ids = [item.item_uuid for item in item_response]
     owners_map = await get_item_owners_batch(session, [str(i_id) for i_id in item_ids])
 
-    # Concurrent execution: request the URL for all items in the list at the same time.
-    tasks = []
+    user_ids = []
     for item in item_response:
-        print("uuid:", item.item_uuid)
         raw_user_id = owners_map.get(str(item.item_uuid))
-        if raw_user_id:
-            u_id = UUID(str(raw_user_id))
-        else:
-            u_id = None
-        tasks.append(complete_item(item, u_id, client_user))
+        user_ids.append(UUID(str(raw_user_id)) if raw_user_id else None)
 
-    result_items = await asyncio.gather(*tasks)
+    # Fetch each distinct owner and address once for the whole page
+    result_items = await complete_items(item_response, user_ids, client_user)
 
+    not_modified = conditional_get(request, response, _items_etag(result_items))
+    if not_modified:
+        return not_modified
     return result_items
 
 
+def _items_etag(items: List[ItemRead]) -> str:
+    """Hash of the enriched page, so owner and address changes also change it"""
+    return compute_etag([item.model_dump(mode="json") for item in items])
+
+
 @item_router.get(
     "/categories",
     response_model=List[CategoryRead]
 )
 async def list_categories(
+        request: Request,
+        response: Response,
         skip: int = Query(0, ge=0, description="Number of items to skip"),
         limit: int = Query(10, ge=1, le=100, description="Max number of items to return"),
         client: Client = Depends(get_item_client)
-) -> List[CategoryRead]:
-    downstream_response = await list_categories_items_categories_get.asyncio(
-        client=client,
-        skip=skip,
-        limit=limit
-    )
-    return [CategoryRead(**category.to_dict()) for category in downstream_response]
+):
+    """
+    Get categories through pagination, served from the in-memory category table
+    """
+    if not await ensure_categories(client):
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Item service is unavailable."
+        )
+
+    not_modified = conditional_get(request, response, get_categories_etag())
+    if not_modified:
+        return not_modified
+
+    return get_categories_page(skip, limit)
 
 
 @item_router.get(
@@ -126,39 +167,27 @@ async def list_categories(
 )
 async def get_public_item_by_id(
     item_id: UUID,
+    request: Request,
     response: Response,
     session: SessionDep,
     item_client: Client = Depends(get_item_client),
     user_client: Client = Depends(get_user_client)
 ):
     """
-    Get an item by its id
+    Get an item by its id, from the local read-model when it is fresh
     """
-    item_response = await get_item_items_item_id_get.asyncio(
-        client=item_client,
-        item_id=item_id
-    )
-
-    if item_response is None:
+    found = await get_item_with_owner(session, item_id, item_client, user_client)
+    if found is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Item not found"
         )
+    item_dict, user_id = found
 
-    if isinstance(item_response, HTTPValidationError):
-        log.error(
-            "Downstream 'item service' validation failed for GET /items/%s. Response: %s",
-            item_id,
-            item_response.to_dict()
-        )
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail="An internal error occurred."
-        )
-
-    user_id = await get_item_owner(session, str(item_response.item_uuid))
-
-    etag_value = item_response.updated_at.isoformat()    # timestamp -> ISO string
-    response.headers["ETag"] = f'"{etag_value}"'
+    # The item's updated_at is its ETag, also expected back in If-Match by PATCH /me/items/{id}
+    if item_dict.get("updated_at"):
+        not_modified = conditional_get(request, response, f'"{item_dict["updated_at"]}"')
+        if not_modified:
+            return not_modified
 
-    return await complete_item(item_response, user_id, user_client)
+    return await complete_item(item_dict, user_id, user_client)
@@ -1,10 +1,10 @@
-from fastapi import APIRouter, Request, Depends, Header, HTTPException, status
+from fastapi import APIRouter, Request, Response, Depends, Header, HTTPException, Query, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from typing import Optional
 from uuid import UUID
 import base64
 import json
 import logging
-import asyncio
 
 from app.client.item.item_api_client.client import Client
 from app.client.item.item_api_client.models import HTTPValidationError
@@ -16,7 +16,7 @@ from app.client.item.item_api_client.api.items import (
     delete_item_items_item_id_delete
 )
 
-from app.models.dto.item_user_dto import CreateOwnItemReq, UpdateOwnItemReq
+from app.models.dto.item_user_dto import CreateOwnItemReq, UpdateOwnItemReq, ItemPageRes
 from app.models.dto.item_dto import ItemCreate, ItemRead, ItemUpdate
 from app.models.dto.job_dto import JobRead, JobStatus
 from app.models.dto.pubsub_dto import PubSubEnvelope, PubSubMessage
@@ -28,10 +28,18 @@ from app.services.item_user_repository import (
     get_user_items,
     delete_item_user_relation
 )
-from app.services.item_service import complete_item
+from app.services.item_service import complete_item, complete_items
+from app.services.item_summary_repository import delete_item_summary
+from app.services.item_summary_service import (
+    fetch_item,
+    list_items_from_read_model,
+    store_item_summary,
+    summary_to_item_dict,
+)
 from app.utils.auth import get_user_id_from_token
 from app.utils.db_connection import SessionDep
-from app.utils.config import get_item_client
+from app.utils.etag import compute_etag, conditional_get
+from app.utils.config import get_item_client, with_request_headers
 from app.utils.config import get_address_client
 
 
@@ -58,7 +66,7 @@ async def create_item_for_me(
     # downstream_req = ItemCreate(**payload.model_dump(exclude={"address_UUID"}))
     downstream_req = ItemCreate(**payload.model_dump())
 
-    client = client.with_headers({"X-User-Id": user_id})
+    client = with_request_headers(client, {"X-User-Id": user_id})
 
     # Handle the job returned by the request
     job_response = await create_item_items_post.asyncio(
@@ -154,47 +162,77 @@ async def get_my_job_status(
     )
 
 
-@item_user_router.get("/me/items")
+@item_user_router.get("/me/items", response_model=ItemPageRes)
 async def list_my_items(
         request: Request,
+        response: Response,
         session: SessionDep,
-        skip: int = 0,
-        limit: int = 10,
+        skip: int = Query(0, ge=0),
+        limit: int = Query(10, ge=1, le=100),
+        cursor: Optional[str] = None,
         item_client = Depends(get_item_client),
         address_client = Depends(get_address_client),
 ):
     user_id = request.state.user_id
 
-    # Get all the item_ids for a user
-    item_ids_str = await get_user_items(session, user_id=user_id, skip=skip, limit=limit)
+    # Get a page of item_ids for a user
+    item_ids_str, next_cursor = await get_user_items(
+        session, user_id=user_id, limit=limit, cursor=cursor, skip=skip
+    )
 
     if not item_ids_str:
-        return []
+        return ItemPageRes(items=[], next_cursor=next_cursor)
 
     try:
         item_uuids = [UUID(i) for i in item_ids_str]
     except ValueError:
         raise HTTPException(status_code=500, detail="Database contained invalid UUID format")
 
-    response = await list_items_items_get.asyncio(
+    summaries = await list_items_from_read_model(
+        session, item_client, address_client, item_ids=item_uuids, limit=len(item_uuids)
+    )
+    if summaries is not None:
+        # Keep the newest-first order of the local page
+        position = {item_id: i for i, item_id in enumerate(item_ids_str)}
+        summaries = sorted(summaries, key=lambda summary: position.get(summary.item_id, len(position)))
+        result_items = await complete_items(
+            [summary_to_item_dict(summary) for summary in summaries],
+            [UUID(user_id)] * len(summaries),
+            address_client
+        )
+        page = ItemPageRes(items=result_items, next_cursor=next_cursor)
+        not_modified = conditional_get(request, response, compute_etag(page.model_dump(mode="json")))
+        if not_modified:
+            return not_modified
+        return page
+
+    item_response = await list_items_items_get.asyncio(
         client=item_client,
         id=item_uuids,
+        limit=len(item_uuids),
     )
 
-    if response is None:
-        return []
-    elif isinstance(response, HTTPValidationError):
+    if item_response is None:
+        return ItemPageRes(items=[], next_cursor=next_cursor)
+    elif isinstance(item_response, HTTPValidationError):
         raise HTTPException(
             status_code=500,
             detail="Failed to fetch item details for specific user from downstream service."
         )
 
-    # Concurrent execution: request the URL for all items in the list at the same time.
-    result_items = await asyncio.gather(
-        *[complete_item(item, UUID(user_id), address_client) for item in response]
-    )
+    # Keep the newest-first order of the local page
+    position = {item_uuid: i for i, item_uuid in enumerate(item_uuids)}
+    item_response = sorted(item_response, key=lambda item: position.get(item.item_uuid, len(position)))
+
+    # Fetch each distinct address once for the whole page
+    result_items = await complete_items(item_response, [UUID(user_id)] * len(item_response), address_client)
 
-    return result_items
+    # Hashed after enrichment, so profile and address changes also change the ETag
+    page = ItemPageRes(items=result_items, next_cursor=next_cursor)
+    not_modified = conditional_get(request, response, compute_etag(page.model_dump(mode="json")))
+    if not_modified:
+        return not_modified
+    return page
 
 
 @item_user_router.patch(
@@ -241,6 +279,8 @@ async def update_my_item(
             detail=response.to_dict() if hasattr(response, "to_dict") else "Validation error"
         )
 
+    await store_item_summary(session, response, user_id, user_client)
+
     return await complete_item(response, UUID(user_id), user_client)
 
 
@@ -273,6 +313,7 @@ async def delete_my_item(
 
     # If remote delete successfully, then delete local relationship
     await delete_item_user_relation(session, item_id)
+    await delete_item_summary(session, item_id)
 
     return
 
@@ -281,11 +322,13 @@ async def delete_my_item(
 @item_user_router.post("/webhooks/pubsub/item-created", status_code=200)
 async def handle_item_created_event(
         envelope: PubSubEnvelope,
-        session: SessionDep
+        session: SessionDep,
+        item_client: Client = Depends(get_item_client),
+        address_client = Depends(get_address_client),
 ):
     """
     Push Endpoint triggered by Google Cloud Pub/Sub.
-    Get information of successfully created item and store relationship.
+    Get information of successfully created item, store relationship and item summary.
     """
     try:
         # Decode Pub/Sub message (Base64 -> JSON String -> Dict)
@@ -305,22 +348,24 @@ async def handle_item_created_event(
             # 200 indicating receiving message, avoiding loop of Pub/Sub
             return {"status": "error", "reason": "Missing data"}
 
-        # Idempotence Check
-        is_owned = await verify_item_ownership(
+        # Idempotent: redelivered events hit the unique (item_id, user_id) index
+        await create_item_user_relation(
             session=session,
             item_id=item_id_str,
             user_id=user_id_str
         )
+        log.info(f"Relation stored via Pub/Sub: User {user_id_str} - Item {item_id_str}")
 
-        if not is_owned:
-            await create_item_user_relation(
-                session=session,
-                item_id=item_id_str,
-                user_id=user_id_str
+        # The summary is best effort, a missing one is filled on the first read
+        try:
+            item_response = await fetch_item(
+                client=item_client,
+                item_id=UUID(item_id_str)
             )
-            log.info(f"Relation created via Pub/Sub: User {user_id_str} - Item {item_id_str}")
-        else:
-            log.info(f"Relation already exists (Idempotent skip): {item_id_str}")
+            if item_response is not None and not isinstance(item_response, HTTPValidationError):
+                await store_item_summary(session, item_response, user_id_str, address_client)
+        except Exception as e:
+            log.warning(f"Item summary not stored for item {item_id_str}: {str(e)}")
 
         return {"status": "processed"}
 
@@ -1,4 +1,6 @@
-from fastapi import APIRouter, status, HTTPException, Request
+from typing import Optional
+
+from fastapi import APIRouter, status, HTTPException, Query, Request
 from app.client.item.item_api_client.models.http_validation_error import HTTPValidationError
 from app.utils.db_connection import SessionDep
 
@@ -62,10 +64,12 @@ async def create_thread(
 async def get_my_threads(
     request: Request,
     session: SessionDep,
+    limit: Optional[int] = Query(None, ge=1, le=100),
+    cursor: Optional[str] = None,
 ):
     current_user_id = request.state.user_id
-    threads = await get_user_threads(session, current_user_id)
-    return {"user_id": current_user_id, "threads": threads}
+    threads, next_cursor = await get_user_threads(session, current_user_id, limit=limit, cursor=cursor)
+    return {"user_id": current_user_id, "threads": threads, "next_cursor": next_cursor}
 
 
 
@@ -1,5 +1,10 @@
 from fastapi import APIRouter
 
+from app.services.address_service import address_cache
+from app.services.user_service import public_user_cache
+from app.utils.db_connection import get_pool_metrics
+from app.utils.singleflight import get_single_flight_stats
+
 root_router = APIRouter()
 
 
@@ -8,4 +13,16 @@ def root():
     return {"message": "Welcome to the Composite API. See /docs for details."}
 
 
+@root_router.get("/metrics")
+def metrics():
+    return {
+        "db_pool": get_pool_metrics(),
+        "single_flight": get_single_flight_stats(),
+        "cache": {
+            public_user_cache.name: public_user_cache.stats(),
+            address_cache.name: address_cache.stats(),
+        },
+    }
+
+
 
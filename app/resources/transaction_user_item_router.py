@@ -1,44 +1,40 @@
-from fastapi import APIRouter, HTTPException, Header, status, Depends, Request
+from fastapi import APIRouter, HTTPException, Header, Query, status, Depends, Request, Response
 from typing import Optional, Literal
 import asyncio
-from concurrent.futures import ThreadPoolExecutor
+import os
 
 from fastapi.security import HTTPBearer
 
 from app.models.dto.transaction_user_item_dto import (
     CreateTransactionReq,
     TransactionRes,
+    TransactionPageRes,
     UpdateTransactionStatusReq
 )
 from app.services.transaction_user_item_repository import (
     create_transaction_user_item_relation,
-    get_transaction_relation,
+    get_transaction_relation_with_role,
     get_user_transactions,
-    verify_transaction_initiator,
-    verify_transaction_receiver,
-    delete_transaction_relation
+    delete_transaction_relation,
+    TransactionRole
 )
 from app.utils.db_connection import SessionDep
 from app.utils.config import get_transaction_client
+from app.utils.etag import compute_etag, conditional_get
+from app.utils.pagination import encode_cursor
 
 from app.client.transaction.transaction_api_client.api.default import (
     create_transaction_transactions_transaction_post,
     get_transaction_transactions_transaction_id_get,
-    list_transactions_transactions_get,
     update_transaction_transactions_transaction_id_put,
     delete_transaction_transactions_transaction_id_delete
 )
 from app.client.transaction.transaction_api_client.models.new_transaction_request import NewTransactionRequest
+from app.client.transaction.transaction_api_client.models.transaction import Transaction
 from app.client.transaction.transaction_api_client.models.new_transaction_request_type import NewTransactionRequestType
 from app.client.transaction.transaction_api_client.models.new_transaction_request_status import NewTransactionRequestStatus
 from app.client.transaction.transaction_api_client.models.update_status_request import UpdateStatusRequest
 from app.client.transaction.transaction_api_client.models.update_status_request_status import UpdateStatusRequestStatus
-from app.client.transaction.transaction_api_client.models.list_transactions_transactions_get_status_param_type_0 import (
-    ListTransactionsTransactionsGetStatusParamType0
-)
-from app.client.transaction.transaction_api_client.models.list_transactions_transactions_get_type_type_0 import (
-    ListTransactionsTransactionsGetTypeType0
-)
 
 
 security = HTTPBearer(auto_error=False)
@@ -47,8 +43,26 @@ transaction_user_item_router = APIRouter(
     dependencies=[Depends(security)],
 )
 
-# Thread pool executor for parallel execution
-_thread_pool = ThreadPoolExecutor(max_workers=10, thread_name_prefix="transaction_worker")
+# Upper bound of concurrent transaction service requests per listing
+TRANSACTION_FETCH_MAX_CONCURRENCY = int(os.getenv("TRANSACTION_FETCH_MAX_CONCURRENCY", "10"))
+# Upper bound of relations checked per listing when filtering by status or type,
+# each one costs a transaction service request
+TRANSACTION_SCAN_MAX_RELATIONS = int(os.getenv("TRANSACTION_SCAN_MAX_RELATIONS", "200"))
+
+
+async def _fetch_transactions(transaction_ids: list[str]) -> list:
+    """Fetch transactions by id concurrently, None for missing ones"""
+    semaphore = asyncio.Semaphore(TRANSACTION_FETCH_MAX_CONCURRENCY)
+
+    async def _fetch(transaction_id: str):
+        async with semaphore:
+            result = await get_transaction_transactions_transaction_id_get.asyncio(
+                client=get_transaction_client(),
+                transaction_id=transaction_id
+            )
+        return result if isinstance(result, Transaction) else None
+
+    return await asyncio.gather(*[_fetch(t_id) for t_id in transaction_ids])
 
 
 @transaction_user_item_router.post("/transactions/transaction", response_model=TransactionRes, status_code=status.HTTP_201_CREATED)
@@ -118,39 +132,27 @@ async def get_transaction(
     transaction_id: str,
     session: SessionDep,
     request: Request,
+    response: Response,
 ):
     user_id = request.state.user_id
     
     try:
-        # Parallel execution using threads: fetch from microservice in thread, DB query stays async
-        loop = asyncio.get_event_loop()
-        
-        # Define function to run in thread (only for synchronous API call)
-        def fetch_transaction_from_service():
-            """Fetch transaction from Transaction Service (synchronous call in thread)"""
-            try:
-                return get_transaction_transactions_transaction_id_get.sync(
-                    client=get_transaction_client(),
-                    transaction_id=transaction_id
-                )
-            except Exception as e:
-                raise
-        
-        # Execute operations in parallel:
-        # 1. API call runs in thread pool (synchronous blocking call)
-        # 2. Database query runs asynchronously in main event loop
-        transaction_result, relation = await asyncio.gather(
-            loop.run_in_executor(_thread_pool, fetch_transaction_from_service),
-            get_transaction_relation(session, transaction_id)  # Keep async, runs in main loop
+        # Fetch from microservice and query DB concurrently on the event loop
+        transaction_result, (relation, role) = await asyncio.gather(
+            get_transaction_transactions_transaction_id_get.asyncio(
+                client=get_transaction_client(),
+                transaction_id=transaction_id
+            ),
+            get_transaction_relation_with_role(session, transaction_id, user_id)
         )
         
         if not transaction_result:
             raise HTTPException(status_code=404, detail="Transaction not found")
 
-        if user_id not in [relation.initiator_user_id, relation.receiver_user_id]:
+        if role == TransactionRole.NONE:
             raise HTTPException(status_code=404, detail="Transaction not found")
         
-        return TransactionRes(
+        transaction = TransactionRes(
             transaction_id=transaction_result.transaction_id,
             requested_item_id=relation.requested_item_id,
             initiator_user_id=relation.initiator_user_id,
@@ -163,6 +165,11 @@ async def get_transaction(
             created_at=transaction_result.created_at,
             updated_at=transaction_result.updated_at,
         )
+
+        not_modified = conditional_get(request, response, compute_etag(transaction.model_dump(mode="json")))
+        if not_modified:
+            return not_modified
+        return transaction
         
     except HTTPException:
         raise
@@ -170,84 +177,90 @@ async def get_transaction(
         raise HTTPException(status_code=500, detail=str(e))
 
 
-@transaction_user_item_router.get("/transactions", response_model=list[TransactionRes])
+@transaction_user_item_router.get("/transactions", response_model=TransactionPageRes)
 async def list_transactions(
     session: SessionDep,
     request: Request,
     status_param: Optional[Literal["pending", "accepted", "rejected", "canceled", "completed"]] = None,
     requested_item_id: Optional[str] = None,
     type: Optional[Literal["trade", "purchase"]] = None,
-    limit: int = 50,
-    offset: int = 0,
+    limit: int = Query(50, ge=1, le=100),
+    offset: int = Query(0, ge=0),
+    cursor: Optional[str] = None,
 ):
     user_id = request.state.user_id
     
     try:
-        # Prepare query parameters for downstream service
-        status_param_client = None
-        if status_param:
-            status_param_client = ListTransactionsTransactionsGetStatusParamType0(status_param)
-        
-        type_client = None
-        if type:
-            type_client = ListTransactionsTransactionsGetTypeType0(type)
-        
-        # Parallel execution using threads: fetch user relations (async) and downstream transactions (thread)
-        loop = asyncio.get_event_loop()
-        
-        # Define function to run in thread (only for synchronous API call)
-        def fetch_transactions_from_service():
-            """Fetch transactions from Transaction Service (synchronous call in thread)"""
-            try:
-                return list_transactions_transactions_get.sync(
-                    client=get_transaction_client(),
-                    status_param=status_param_client,
-                    type_=type_client,
-                    limit=limit,
-                    offset=offset
-                )
-            except Exception as e:
-                raise
-        
-        # Execute operations in parallel:
-        # 1. API call runs in thread pool (synchronous blocking call)
-        # 2. Database query runs asynchronously in main event loop
-        relations, transactions_result = await asyncio.gather(
-            get_user_transactions(session, user_id),  # Keep async, runs in main loop
-            loop.run_in_executor(_thread_pool, fetch_transactions_from_service)
-        )
-        
-        if requested_item_id:
-            relations = [r for r in relations if r.requested_item_id == requested_item_id]
-        
-        relation_map = {r.transaction_id: r for r in relations}
-        
-        if not transactions_result:
-            return []
-        
-        # Combine results: only include transactions where user is a participant
+        # Page over the caller's own relations and fetch exactly those transactions.
+        # Status and type only exist downstream, so with those filters further
+        # relation pages are scanned until the requested page is filled, or
+        # TRANSACTION_SCAN_MAX_RELATIONS have been checked. A page cut short by that
+        # bound can hold fewer items than the limit, its next_cursor continues the scan.
+        # A legacy offset combined with those filters only skips matches within the scan.
+        has_downstream_filter = status_param is not None or type is not None
+        # Legacy offset paging: pushed into SQL unless matches can only be counted after fetching
+        sql_offset = offset if not cursor and not has_downstream_filter else 0
+        to_skip = offset if not cursor and has_downstream_filter else 0
+        scan_cursor = cursor
+        exhausted = False
+        scan_budget = TRANSACTION_SCAN_MAX_RELATIONS if has_downstream_filter else limit
+
         combined_results = []
-        for trans in transactions_result:
-            if trans.transaction_id not in relation_map:
-                continue
-            
-            rel = relation_map[trans.transaction_id]
-            combined_results.append(TransactionRes(
-                transaction_id=trans.transaction_id,
-                requested_item_id=rel.requested_item_id,
-                initiator_user_id=rel.initiator_user_id,
-                receiver_user_id=rel.receiver_user_id,
-                type=trans.type_.value,
-                offered_item_id=rel.offered_item_id,
-                offered_price=trans.offered_price if trans.offered_price else None,
-                status=trans.status.value,
-                message=trans.message if trans.message else None,
-                created_at=trans.created_at,
-                updated_at=trans.updated_at,
-            ))
-        
-        return combined_results
+        while len(combined_results) < limit and scan_budget > 0:
+            batch_size = max(1, min(limit, scan_budget))
+            relations = await get_user_transactions(
+                session,
+                user_id,
+                requested_item_id=requested_item_id,
+                limit=batch_size,
+                cursor=scan_cursor,
+                offset=sql_offset,
+            )
+            sql_offset = 0
+            scan_budget -= len(relations)
+            transactions = await _fetch_transactions([r.transaction_id for r in relations])
+
+            scanned = 0
+            for rel, trans in zip(relations, transactions):
+                scanned += 1
+                scan_cursor = encode_cursor(rel.created_at, rel.id)
+                if trans is None:
+                    continue
+                if status_param and trans.status.value != status_param:
+                    continue
+                if type and trans.type_.value != type:
+                    continue
+                if to_skip > 0:
+                    to_skip -= 1
+                    continue
+                combined_results.append(TransactionRes(
+                    transaction_id=trans.transaction_id,
+                    requested_item_id=rel.requested_item_id,
+                    initiator_user_id=rel.initiator_user_id,
+                    receiver_user_id=rel.receiver_user_id,
+                    type=trans.type_.value,
+                    offered_item_id=rel.offered_item_id,
+                    offered_price=trans.offered_price if trans.offered_price else None,
+                    status=trans.status.value,
+                    message=trans.message if trans.message else None,
+                    created_at=trans.created_at,
+                    updated_at=trans.updated_at,
+                ))
+                if len(combined_results) >= limit:
+                    break
+
+            if len(relations) < batch_size and scanned == len(relations):
+                # Every remaining relation has been scanned
+                exhausted = True
+                break
+        
+        return TransactionPageRes(
+            items=combined_results,
+            next_cursor=None if exhausted else scan_cursor,
+        )
         
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -262,22 +275,20 @@ async def update_transaction(
     user_id = request.state.user_id
     
     try:
-        relation = await get_transaction_relation(session, transaction_id)
+        relation, role = await get_transaction_relation_with_role(session, transaction_id, user_id)
         
         # Verify user is a participant (initiator or receiver)
-        if user_id not in [relation.initiator_user_id, relation.receiver_user_id]:
+        if role == TransactionRole.NONE:
             raise HTTPException(status_code=404, detail="Transaction not found")
         
         # Permission checks: only initiator can cancel
         if payload.status == "canceled":
-            is_initiator = await verify_transaction_initiator(session, transaction_id, user_id)
-            if not is_initiator:
+            if role != TransactionRole.INITIATOR:
                 raise HTTPException(status_code=403, detail="Only initiator can cancel the transaction")
         
         # Permission checks: only receiver can accept or reject
         elif payload.status in ["accepted", "rejected"]:
-            is_receiver = await verify_transaction_receiver(session, transaction_id, user_id)
-            if not is_receiver:
+            if role != TransactionRole.RECEIVER:
                 raise HTTPException(status_code=403, detail="Only receiver can accept or reject the transaction")
         
         update_req = UpdateStatusRequest(
@@ -322,34 +333,24 @@ async def delete_transaction(
     user_id = request.state.user_id
     
     try:
-        # Parallel execution using threads: fetch transaction (thread), relation (async), and verify permission (async)
-        loop = asyncio.get_event_loop()
-        
-        # Define function to run in thread (only for synchronous API call)
-        def fetch_transaction_from_service():
-            """Fetch transaction from Transaction Service (synchronous call in thread)"""
-            try:
-                return get_transaction_transactions_transaction_id_get.sync(
-                    client=get_transaction_client(),
-                    transaction_id=transaction_id
-                )
-            except Exception as e:
-                raise
-        
-        # Execute operations in parallel:
-        # 1. API call runs in thread pool (synchronous blocking call)
-        # 2. Database queries run asynchronously in main event loop
-        transaction_result, relation, is_initiator = await asyncio.gather(
-            loop.run_in_executor(_thread_pool, fetch_transaction_from_service),
-            get_transaction_relation(session, transaction_id),  # Keep async, runs in main loop
-            verify_transaction_initiator(session, transaction_id, user_id)  # Keep async, runs in main loop
+        # Fetch from microservice and query DB concurrently on the event loop
+        transaction_result, (relation, role) = await asyncio.gather(
+            get_transaction_transactions_transaction_id_get.asyncio(
+                client=get_transaction_client(),
+                transaction_id=transaction_id
+            ),
+            get_transaction_relation_with_role(session, transaction_id, user_id)
         )
         
         if not transaction_result:
             raise HTTPException(status_code=404, detail="Transaction not found")
         
+        # Non-participants can't tell the transaction exists
+        if role == TransactionRole.NONE:
+            raise HTTPException(status_code=404, detail="Transaction not found")
+
         # Permission check: only initiator can delete
-        if not is_initiator:
+        if role != TransactionRole.INITIATOR:
             raise HTTPException(status_code=403, detail="Only initiator can delete the transaction")
         
         return_data = TransactionRes(
@@ -1,9 +1,10 @@
+import asyncio
 import json
 import os
 import httpx
 from uuid import UUID
 
-from fastapi import APIRouter, HTTPException, Depends
+from fastapi import APIRouter, HTTPException, Depends, Response
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from sqlmodel.ext.asyncio.session import AsyncSession
 from starlette.requests import Request
@@ -18,9 +19,6 @@ from app.client.user.user_address_api_client.api.default.login_auth_token_post i
 from app.client.user.user_address_api_client.api.default.get_user_users_user_id_get import (
     asyncio as get_user_async,
 )
-from app.client.user.user_address_api_client.api.default.get_address_addresses_address_id_get import (
-    asyncio as get_address_async,
-)
 from app.client.user.user_address_api_client.api.default.create_user_users_post import (
     asyncio as create_user_async,
 )
@@ -30,7 +28,6 @@ from app.client.user.user_address_api_client.models.token import Token
 from app.client.user.user_address_api_client.models.user_create import UserCreate
 from app.client.user.user_address_api_client.models.user_read import UserRead
 from app.client.user.user_address_api_client.types import UNSET
-from app.client.user.user_address_api_client.models.address_read import AddressRead
 
 from app.models.dto.user_dto import (
     SignInRes,
@@ -45,8 +42,11 @@ from app.models.dto.user_dto import (
 from app.models.dto.address_dto import AddressDTO
 
 from app.services.address_user_repository import get_user_addresses
+from app.services.address_service import get_addresses
+from app.services.user_service import get_public_user, invalidate_public_user
 from app.utils.config import get_user_client, get_address_client
 from app.utils.db_connection import get_session
+from app.utils.etag import compute_etag, conditional_get
 from dotenv import load_dotenv
 
 
@@ -97,12 +97,12 @@ async def google_sign_in(payload: GoogleLoginReq, request: Request):
         headers["X-Correlation-ID"] = corr_id
 
     try:
-        async with httpx.AsyncClient(timeout=5.0) as client:
-            resp = await client.post(
-                f"{USER_SERVICE_URL}/auth/google",
-                json={"id_token": payload.id_token},
-                headers=headers,
-            )
+        resp = await get_user_client().get_async_httpx_client().post(
+            f"{USER_SERVICE_URL}/auth/google",
+            json={"id_token": payload.id_token},
+            headers=headers,
+            timeout=5.0,
+        )
     except httpx.HTTPError as e:
         raise HTTPException(status_code=502, detail=f"User service error: {e!s}")
 
@@ -166,33 +166,33 @@ async def create_user(payload: SignUpReq, request: Request):
     )
 
 @user_router.get("/users/{user_id}", response_model=PublicUserRes)
-async def get_user_by_id(user_id: UUID, request: Request):
+async def get_user_by_id(user_id: UUID, request: Request, response: Response):
 
-    result = await get_user_async(user_id=user_id, client=get_user_client())
+    public_user = await get_public_user(user_id, get_user_client())
 
-    if result is None:
+    if public_user is None:
         raise HTTPException(status_code=404, detail="User not found")
 
-    if isinstance(result, HTTPValidationError):
-        raise HTTPException(status_code=404, detail="User not found")
+    not_modified = conditional_get(request, response, compute_etag(public_user))
+    if not_modified:
+        return not_modified
 
-    user: UserRead = result
-
-    return PublicUserRes(
-        id=user.id if user.id is not UNSET else user_id,
-        username=user.username,
-        avatar_url=user.avatar_url if not isinstance(user.avatar_url, type(UNSET)) else None,
-    )
+    return PublicUserRes(**public_user)
 
 
 @user_router.get("/me/user", response_model=SignedInUserRes)
 async def auth_me(
         request: Request,
+        response: Response,
         session: AsyncSession = Depends(get_session),
 ):
     user_id = request.state.user_id
 
-    result = await get_user_async(user_id=user_id, client=get_user_client())
+    # Profile and local address ids are independent, fetch them at the same time
+    result, (address_ids, _) = await asyncio.gather(
+        get_user_async(user_id=user_id, client=get_user_client()),
+        get_user_addresses(session, str(user_id)),
+    )
 
     if result is None:
         raise HTTPException(status_code=502, detail="User service returned no data")
@@ -202,37 +202,17 @@ async def auth_me(
 
     user: UserRead = result
 
-    address_ids = await get_user_addresses(session, str(user_id))
-
-    addresses_dto: list[AddressDTO] = []
-
+    addr_uuids = []
     for addr_id in address_ids:
         try:
-            addr_uuid = UUID(str(addr_id))
+            addr_uuids.append(UUID(str(addr_id)))
         except ValueError:
             continue
 
-        addr_result = await get_address_async(address_id=addr_uuid, client=get_address_client())
-
-        if addr_result is None or isinstance(addr_result, HTTPValidationError):
-            continue
-
-        addr: AddressRead = addr_result
-
-        addresses_dto.append(
-            AddressDTO(
-                id=addr.id if addr.id is not UNSET else None,
-                street=addr.street,
-                city=addr.city,
-                state=addr.state if not isinstance(addr.state, type(UNSET)) else None,
-                postal_code=addr.postal_code if not isinstance(addr.postal_code, type(UNSET)) else None,
-                country=addr.country,
-                created_at=addr.created_at if not isinstance(addr.created_at, type(UNSET)) else None,
-                updated_at=addr.updated_at if not isinstance(addr.updated_at, type(UNSET)) else None,
-            )
-        )
+    addresses = await get_addresses(addr_uuids, get_address_client())
+    addresses_dto: list[AddressDTO] = [AddressDTO(**addr) for addr in addresses]
 
-    return SignedInUserRes(
+    me = SignedInUserRes(
         id=user.id if not isinstance(user.id, type(UNSET)) else None,
         username=user.username,
         email=user.email,
@@ -244,6 +224,12 @@ async def auth_me(
         updated_at=user.updated_at if not isinstance(user.updated_at, type(UNSET)) else None,
     )
 
+    not_modified = conditional_get(request, response, compute_etag(me.model_dump(mode="json")))
+    if not_modified:
+        return not_modified
+
+    return me
+
 @user_router.put("/me/user", response_model=SignedInUserRes)
 async def update_me(
     request: Request,
@@ -269,6 +255,8 @@ async def update_me(
     if isinstance(result, HTTPValidationError):
          raise HTTPException(status_code=400, detail="Invalid data for update")
 
+    invalidate_public_user(user_id)
+
     user: UserRead = result
 
     return SignedInUserRes(
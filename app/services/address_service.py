@@ -0,0 +1,94 @@
+from fastapi import status
+from fastapi.exceptions import HTTPException
+from uuid import UUID
+import asyncio
+import logging
+import os
+
+from app.client.user.user_address_api_client.api.default import get_address_addresses_address_id_get
+from app.client.user.user_address_api_client.models import HTTPValidationError
+from app.utils.cache import AsyncTTLCache
+
+
+log = logging.getLogger(__name__)
+
+# Addresses are read on every item page and /me/user, but change only through this service
+address_cache = AsyncTTLCache(
+    name="address",
+    maxsize=int(os.getenv("ADDRESS_CACHE_MAX_ENTRIES", "10000")),
+    ttl=float(os.getenv("ADDRESS_CACHE_TTL", "600")),
+)
+
+ADDRESS_FETCH_MAX_CONCURRENCY = int(os.getenv("ADDRESS_FETCH_MAX_CONCURRENCY", "8"))
+ADDRESS_FETCH_TIMEOUT = float(os.getenv("ADDRESS_FETCH_TIMEOUT", "2.0"))
+
+
+async def get_address(
+        address_id: UUID,
+        client,
+) -> dict | None:
+    """
+    Get an address, served from cache when possible
+    Args:
+        address_id: id of the address
+        client:     client for address
+
+    Returns:        address dict, None if the address doesn't exist
+    """
+    async def _load() -> dict | None:
+        address_response = await get_address_addresses_address_id_get.asyncio(
+            address_id=address_id,
+            client=client
+        )
+        if isinstance(address_response, HTTPValidationError):
+            log.error(
+                "Downstream 'user service (address)' validation failed. Response: %s",
+                address_response.to_dict()
+            )
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail="An internal error occurred."
+            )
+        if address_response is None:
+            return None
+        return address_response.to_dict()
+
+    return await address_cache.get_or_load(str(address_id), _load)
+
+
+async def get_addresses(
+        address_ids: list[UUID],
+        client,
+) -> list[dict]:
+    """
+    Get several addresses in parallel, keeping their order
+    Args:
+        address_ids: ids of the addresses
+        client:      client for address
+
+    Returns:         address dicts; missing, failing or slow addresses are omitted
+    """
+    semaphore = asyncio.Semaphore(ADDRESS_FETCH_MAX_CONCURRENCY)
+
+    async def _get(address_id: UUID) -> dict | None:
+        async with semaphore:
+            try:
+                return await asyncio.wait_for(get_address(address_id, client), ADDRESS_FETCH_TIMEOUT)
+            except asyncio.TimeoutError:
+                log.warning("Address %s timed out after %ss, omitting it", address_id, ADDRESS_FETCH_TIMEOUT)
+            except Exception as e:
+                log.warning("Address %s could not be fetched, omitting it: %s", address_id, e)
+            return None
+
+    addresses = await asyncio.gather(*[_get(address_id) for address_id in address_ids])
+    return [address for address in addresses if address is not None]
+
+
+def cache_address(address_id, address: dict) -> None:
+    """Store an address that was just read or created downstream"""
+    address_cache.set(str(address_id), address)
+
+
+def invalidate_address(address_id) -> None:
+    """Drop a cached address after it was updated or deleted"""
+    address_cache.invalidate(str(address_id))
@@ -1,23 +1,34 @@
+from typing import Optional
+
 from fastapi import HTTPException
-from sqlmodel import select
+from sqlmodel import exists, select
 from sqlmodel.ext.asyncio.session import AsyncSession
 
 from app.models.po.address_user_po import AddressUser
+from app.utils.db_connection import insert_ignore, release_connection, pin_primary, read_from_replica
+from app.utils.pagination import apply_keyset, keyset_page
 
 # Address-User: Many-to-One
 
+@release_connection
 async def create_address_user_relation(
         session: AsyncSession,
         address_id: str,
         user_id: str,
 ) -> AddressUser:
-    address_user = AddressUser(address_id=address_id, user_id=user_id)
-    session.add(address_user)
+    """Create the relation, or get it if it already exists"""
+    await insert_ignore(session, AddressUser(address_id=address_id, user_id=user_id))
     await session.commit()
-    await session.refresh(address_user)
-    return address_user
+    pin_primary(user_id)
+    statement = select(AddressUser).where(
+        AddressUser.address_id == address_id,
+        AddressUser.user_id == user_id
+    )
+    result = await session.exec(statement)
+    return result.one()
 
 
+@release_connection
 async def get_address_owner(
         session: AsyncSession,
         address_id: str,
@@ -30,14 +41,20 @@ async def get_address_owner(
     return address_user.user_id
 
 
+@release_connection
+@read_from_replica
 async def get_user_addresses(
         session: AsyncSession,
         user_id: str,
-) -> list[str]:
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None,
+) -> tuple[list[str], Optional[str]]:
+    """Get address_ids of a user, newest first, and the cursor of the next page"""
     statement = select(AddressUser).where(AddressUser.user_id == user_id)
+    statement = apply_keyset(statement, AddressUser, limit, cursor)
     result = await session.exec(statement)
-    address_users = result.all()
-    return [address_user.address_id for address_user in address_users]
+    address_users, next_cursor = keyset_page(result.all(), limit)
+    return [address_user.address_id for address_user in address_users], next_cursor
 
 
 async def delete_address_user_relation(
@@ -53,15 +70,15 @@ async def delete_address_user_relation(
     await session.commit()
 
 
+@release_connection
 async def verify_address_ownership(
         session: AsyncSession,
         address_id: str,
         user_id: str,
 ) -> bool:
-    statement = select(AddressUser).where(
+    statement = select(exists().where(
         AddressUser.address_id == address_id,
         AddressUser.user_id == user_id
-    )
+    ))
     result = await session.exec(statement)
-    address_user = result.first()
-    return address_user is not None
+    return bool(result.one())
@@ -0,0 +1,120 @@
+import asyncio
+import logging
+import os
+import time
+
+from app.client.item.item_api_client.api.items import list_categories_items_categories_get
+from app.client.item.item_api_client.models import HTTPValidationError
+from app.models.dto.item_dto import CategoryRead
+from app.utils.etag import compute_etag
+from app.utils.singleflight import single_flight
+
+
+log = logging.getLogger(__name__)
+
+# Categories are reference data, the whole table is kept in memory and reloaded periodically
+CATEGORY_REFRESH_INTERVAL = float(os.getenv("CATEGORY_REFRESH_INTERVAL", "300"))
+CATEGORY_PAGE_SIZE = 100
+# After a failed load, requests answer from the failure for this long instead of asking again
+CATEGORY_RETRY_INTERVAL = 5.0
+
+fetch_categories = single_flight("list_categories", list_categories_items_categories_get.asyncio)
+
+
+class CategoryCache:
+    """The full category table, replaced as a whole on every successful load"""
+
+    def __init__(self):
+        self.categories: list[CategoryRead] = []
+        self.by_id: dict[int, CategoryRead] = {}
+        self.etag: str | None = None
+        self._failed_at: float | None = None
+        self._lock = asyncio.Lock()
+
+    @property
+    def loaded(self) -> bool:
+        return self.etag is not None
+
+    def _recently_failed(self) -> bool:
+        return self._failed_at is not None and time.monotonic() - self._failed_at < CATEGORY_RETRY_INTERVAL
+
+    async def load(self, client) -> bool:
+        """
+        Read every category from the item service
+        Args:
+            client: client for item
+
+        Returns:    whether the table was loaded, the previous one is kept otherwise
+        """
+        async with self._lock:
+            return await self._load(client)
+
+    async def ensure(self, client) -> bool:
+        """Load the table unless it is loaded, concurrent callers share one attempt"""
+        if self.loaded:
+            return True
+        if self._recently_failed():
+            return False
+        async with self._lock:
+            # Another caller may have loaded the table, or just failed to, while this one waited
+            if self.loaded:
+                return True
+            if self._recently_failed():
+                return False
+            return await self._load(client)
+
+    async def _load(self, client) -> bool:
+        categories = []
+        skip = 0
+        try:
+            while True:
+                page = await fetch_categories(client=client, skip=skip, limit=CATEGORY_PAGE_SIZE)
+                if page is None or isinstance(page, HTTPValidationError):
+                    log.warning("Loading categories failed, item service returned %s", page)
+                    self._failed_at = time.monotonic()
+                    return False
+                categories.extend(CategoryRead(**category.to_dict()) for category in page)
+                if len(page) < CATEGORY_PAGE_SIZE:
+                    break
+                skip += len(page)
+        except Exception as e:
+            log.warning("Loading categories failed: %s", e)
+            self._failed_at = time.monotonic()
+            return False
+
+        self.categories = categories
+        self.by_id = {category.category_id: category for category in categories}
+        self.etag = compute_etag([category.model_dump() for category in categories])
+        self._failed_at = None
+        return True
+
+    async def refresh_forever(self, client) -> None:
+        while True:
+            await asyncio.sleep(CATEGORY_REFRESH_INTERVAL)
+            await self.load(client)
+
+
+category_cache = CategoryCache()
+
+
+async def ensure_categories(client) -> bool:
+    """Load the categories if startup could not, return whether they are available"""
+    return await category_cache.ensure(client)
+
+
+def get_category(category_id: int) -> CategoryRead | None:
+    return category_cache.by_id.get(category_id)
+
+
+def get_categories_page(skip: int, limit: int) -> list[CategoryRead]:
+    return category_cache.categories[skip:skip + limit]
+
+
+def get_categories_etag() -> str | None:
+    return category_cache.etag
+
+
+async def start_category_cache(client) -> asyncio.Task:
+    """Load the categories and keep refreshing them in the background"""
+    await category_cache.load(client)
+    return asyncio.create_task(category_cache.refresh_forever(client))
@@ -1,12 +1,20 @@
+import asyncio
+import mimetypes
+import multiprocessing
 import os
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from datetime import timedelta
 from fastapi import FastAPI, UploadFile, File, HTTPException, Form
+from fastapi.responses import StreamingResponse
 from typing import Annotated, Tuple
 from fastapi.middleware.cors import CORSMiddleware
-from google.cloud import storage
-from google.oauth2 import service_account
 from dotenv import load_dotenv
-from app.models.dto.image_dto import UploadSuccessResponse, ImageUrlResponse
+from app.models.dto.image_dto import UploadSuccessResponse, ImageUrlResponse, ImageUrlsResponse
+from app.services.image_storage import GCSImageStorage, ImageStorage, LocalImageStorage
+from app.utils.singleflight import SingleFlight
 import uuid
 from PIL import Image
 from io import BytesIO
@@ -18,26 +26,331 @@ app = FastAPI()
 
 BUCKET_NAME = os.getenv("IMAGE_BUCKET_NAME")  
 CREDENTIALS_FILE = os.getenv("GCS_IMAGE_KEY_FILE")
+# "gcs", or "local" to keep images in IMAGE_LOCAL_DIR
+IMAGE_STORAGE_BACKEND = os.getenv("IMAGE_STORAGE_BACKEND", "gcs").strip().lower()
+IMAGE_LOCAL_DIR = os.getenv("IMAGE_LOCAL_DIR", "./images")
+# Key for the URLs of the local backend, a random one is used when it is not set
+IMAGE_URL_SIGNING_KEY = os.getenv("IMAGE_URL_SIGNING_KEY")
+# Prefix of the URLs of the local backend, the URL of this service
+IMAGE_LOCAL_BASE_URL = os.getenv("IMAGE_LOCAL_BASE_URL", "")
+IMAGE_URL_EXPIRY = timedelta(days=3650)  # 10 years - effectively no expiration
+# Signed URLs are handed out again for this long instead of being signed per view,
+# always well inside IMAGE_URL_EXPIRY so a cached URL never outlives its signature
+IMAGE_URL_CACHE_TTL = min(float(os.getenv("IMAGE_URL_CACHE_TTL", "3600")), IMAGE_URL_EXPIRY.total_seconds() / 2)
+IMAGE_URL_CACHE_MAX_ENTRIES = int(os.getenv("IMAGE_URL_CACHE_MAX_ENTRIES", "10000"))
 
+# Created on first use, so neither importing this module nor starting the app reads credentials
+_image_storage: ImageStorage | None = None
 
 
+def _init_image_storage() -> ImageStorage:
+    """Create the configured storage backend"""
+    global _image_storage
+    if IMAGE_STORAGE_BACKEND == "local":
+        signing_key = IMAGE_URL_SIGNING_KEY.encode("utf-8") if IMAGE_URL_SIGNING_KEY else None
+        _image_storage = LocalImageStorage(IMAGE_LOCAL_DIR, signing_key=signing_key, base_url=IMAGE_LOCAL_BASE_URL)
+    elif IMAGE_STORAGE_BACKEND == "gcs":
+        _image_storage = GCSImageStorage.from_credentials_file(CREDENTIALS_FILE, BUCKET_NAME)
+    else:
+        raise ValueError(f"Unknown IMAGE_STORAGE_BACKEND: {IMAGE_STORAGE_BACKEND}")
+    return _image_storage
 
-if CREDENTIALS_FILE and os.path.exists(CREDENTIALS_FILE):
-    credentials = service_account.Credentials.from_service_account_file(CREDENTIALS_FILE)
-    storage_client = storage.Client(credentials=credentials)
-else:
-    raise FileNotFoundError(f"Credentials file not found: {CREDENTIALS_FILE}")
 
-async def get_bucket():
-    return storage_client.bucket(BUCKET_NAME)
+def get_image_storage() -> ImageStorage:
+    if _image_storage is None:
+        return _init_image_storage()
+    return _image_storage
+
+
+# filename -> (signed url, signed at), only images known to exist are kept
+_signed_urls: OrderedDict[str, tuple[str, float]] = OrderedDict()
+# Views of the same uncached image share one existence check and signature
+_url_flight = SingleFlight("image_url")
+
+
+def _cached_image_url(filename: str) -> str | None:
+    cached = _signed_urls.get(filename)
+    if cached is None:
+        return None
+    url, signed_at = cached
+    if time.monotonic() - signed_at >= IMAGE_URL_CACHE_TTL:
+        del _signed_urls[filename]
+        return None
+    _signed_urls.move_to_end(filename)
+    return url
+
+
+async def _sign_image_url(filename: str) -> str:
+    url = await get_image_storage().signed_url(filename, IMAGE_URL_EXPIRY)
+    _signed_urls[filename] = (url, time.monotonic())
+    _signed_urls.move_to_end(filename)
+    while len(_signed_urls) > IMAGE_URL_CACHE_MAX_ENTRIES:
+        _signed_urls.popitem(last=False)
+    return url
+
+
+async def _resolve_image_url(filename: str) -> str | None:
+    # Images uploaded elsewhere, or evicted from the cache, are checked once per window
+    if not await get_image_storage().exists(filename):
+        return None
+    return await _sign_image_url(filename)
+
+
+async def resolve_image_url(filename: str) -> str | None:
+    """
+    Signed URL of an image, from the cache when possible
+    Args:
+        filename:   name of the stored image
+
+    Returns:        the signed URL, None if the image doesn't exist
+    """
+    url = _cached_image_url(filename)
+    if url is not None:
+        return url
+    return await _url_flight.do(filename, lambda: _resolve_image_url(filename))
 
 
 MAX_FILE_SIZE = 5 * 1024 * 1024  # 5MB in bytes
 
+# Compression is CPU bound, it runs in worker processes so the event loop keeps serving requests
+IMAGE_COMPRESS_WORKERS = int(os.getenv("IMAGE_COMPRESS_WORKERS", "2"))
+# Jobs allowed to wait for a worker, beyond that uploads are answered with 503
+IMAGE_COMPRESS_QUEUE_DEPTH = int(os.getenv("IMAGE_COMPRESS_QUEUE_DEPTH", "4"))
+IMAGE_COMPRESS_TIMEOUT = float(os.getenv("IMAGE_COMPRESS_TIMEOUT", "30"))
+# Workers are not forked from the threaded server process. A forkserver imports this module
+# once, so a pool recycled after a timeout starts in milliseconds instead of re-importing the app.
+IMAGE_COMPRESS_START_METHOD = os.getenv(
+    "IMAGE_COMPRESS_START_METHOD",
+    "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn",
+)
+
+_compress_pool: ProcessPoolExecutor | None = None
+# Jobs submitted to the pool and not finished yet, including ones whose caller timed out
+_compress_jobs = 0
+
+
+def _compress_context():
+    context = multiprocessing.get_context(IMAGE_COMPRESS_START_METHOD)
+    if IMAGE_COMPRESS_START_METHOD == "forkserver":
+        # Only takes effect before the forkserver is started
+        context.set_forkserver_preload([__name__])
+    return context
+
+
+def start_compress_workers() -> None:
+    """
+    Start the forkserver in the background at startup. Otherwise the first job
+    blocks the event loop while the forkserver imports the app.
+    """
+    if IMAGE_COMPRESS_START_METHOD == "forkserver":
+        from multiprocessing import forkserver
+        _compress_context()
+        forkserver.ensure_running()
+
+
+def _get_compress_pool() -> ProcessPoolExecutor:
+    global _compress_pool
+    if _compress_pool is None:
+        _compress_pool = ProcessPoolExecutor(max_workers=IMAGE_COMPRESS_WORKERS, mp_context=_compress_context())
+    return _compress_pool
+
+
+def shutdown_compress_pool() -> None:
+    global _compress_pool
+    if _compress_pool is not None:
+        _compress_pool.shutdown(wait=False, cancel_futures=True)
+        _compress_pool = None
+
+
+def _discard_compress_pool(pool: ProcessPoolExecutor, terminate: bool = False) -> None:
+    """
+    Drop a pool, the next job starts a new one
+    Args:
+        pool:       pool that lost a worker, e.g. killed for memory, or has a job stuck in one
+        terminate:  also stop the workers still running, their jobs fail with BrokenProcessPool
+    """
+    global _compress_pool
+    if _compress_pool is pool:
+        _compress_pool = None
+    # shutdown() forgets the workers, keep them to stop the ones still running
+    processes = list((pool._processes or {}).values())
+    pool.shutdown(wait=False, cancel_futures=True)
+    if terminate:
+        for process in processes:
+            process.terminate()
+
+
+def _submit_compress_job(image_data: bytes, max_size: int):
+    pool = _get_compress_pool()
+    try:
+        return pool, pool.submit(_compress_image_sync, image_data, max_size)
+    except BrokenProcessPool:
+        _discard_compress_pool(pool)
+        pool = _get_compress_pool()
+        return pool, pool.submit(_compress_image_sync, image_data, max_size)
+
+
+def _compress_job_done(future: asyncio.Future) -> None:
+    # Runs on the event loop, like the increment in compress_image
+    global _compress_jobs
+    _compress_jobs -= 1
+    if not future.cancelled():
+        future.exception()
+
 
 async def compress_image(image_data: bytes, max_size: int = MAX_FILE_SIZE) -> Tuple[bytes, str]:
     """
-    Compress image to be under max_size (5MB by default).
+    Compress image to be under max_size (5MB by default) in the process pool.
+    Returns compressed image data and content type.
+    Raises 503 when the pool and its queue are full or the job times out.
+    """
+    global _compress_jobs
+    if _compress_jobs >= IMAGE_COMPRESS_WORKERS + IMAGE_COMPRESS_QUEUE_DEPTH:
+        raise HTTPException(
+            status_code=503,
+            detail="Image compression is busy, please retry later",
+            headers={"Retry-After": "5"},
+        )
+
+    pool, future = _submit_compress_job(image_data, max_size)
+    job = asyncio.wrap_future(future)
+    _compress_jobs += 1
+    job.add_done_callback(_compress_job_done)
+    try:
+        # Shielded so a timed out job keeps counting until its worker is stopped with the pool
+        return await asyncio.wait_for(asyncio.shield(job), IMAGE_COMPRESS_TIMEOUT)
+    except asyncio.TimeoutError:
+        # A worker stuck on one image would keep its slot, recycle the pool to free it
+        logger.error(f"Image compression timed out after {IMAGE_COMPRESS_TIMEOUT}s, restarting the pool")
+        _discard_compress_pool(pool, terminate=True)
+        raise HTTPException(status_code=503, detail="Image compression timed out")
+    except asyncio.CancelledError:
+        # A queued job cancelled by another job's timeout, as opposed to this request being cancelled
+        if not job.cancelled() or asyncio.current_task().cancelling():
+            raise
+        raise HTTPException(status_code=503, detail="Image compression was restarted, please retry")
+    except BrokenProcessPool:
+        if pool is not _compress_pool:
+            # Its workers were stopped when another job timed out
+            raise HTTPException(status_code=503, detail="Image compression was restarted, please retry")
+        logger.error("Image compression worker died, restarting the pool")
+        _discard_compress_pool(pool)
+        raise HTTPException(status_code=500, detail="Image compression failed")
+
+
+# Encodes allowed per image, including the first full size one
+MAX_ENCODE_ATTEMPTS = 8
+START_QUALITY = 85
+MIN_QUALITY = 30
+MIN_SCALE = 0.1
+# Formats other than JPEG only get scaled down to this before falling back to JPEG
+MIN_SCALE_BEFORE_JPEG = 0.5
+# Typical JPEG size at MIN_QUALITY relative to START_QUALITY, used for the first guess
+MIN_QUALITY_SIZE_RATIO = 0.35
+# Aim a bit under max_size, size only roughly follows the pixel count
+SCALE_HEADROOM = 0.95
+# A result at least this close to max_size ends the search
+GOOD_ENOUGH_RATIO = 0.85
+
+
+def _encode(image: Image.Image, output_format: str, quality: int) -> bytes:
+    output = BytesIO()
+    if output_format == 'JPEG':
+        image.save(output, format='JPEG', quality=quality, optimize=True)
+    elif output_format == 'PNG':
+        # PNG compression level (0-9, higher = more compression)
+        png_compress_level = min(9, int((100 - quality) / 10))
+        image.save(output, format='PNG', compress_level=png_compress_level, optimize=True)
+    else:
+        # For other formats, try to save with optimization
+        image.save(output, format=output_format, optimize=True)
+    return output.getvalue()
+
+
+def _resize(image: Image.Image, scale: float) -> Image.Image:
+    new_size = (max(1, int(image.size[0] * scale)), max(1, int(image.size[1] * scale)))
+    # reducing_gap first shrinks by an integer factor, which is much cheaper than a full LANCZOS
+    return image.resize(new_size, Image.Resampling.LANCZOS, reducing_gap=3.0)
+
+
+class _CompressionSolver:
+    """
+    Finds the highest quality, then the largest scale, whose encode fits max_size.
+    The bytes per pixel of the first encode place the first guess of each binary search,
+    which stops once a result is close enough to max_size or MAX_ENCODE_ATTEMPTS is reached.
+    """
+
+    def __init__(self, image: Image.Image, max_size: int):
+        self.image = image
+        self.max_size = max_size
+        self.attempts = 0
+        # Lowered while searching a format that may still fall back to JPEG
+        self.max_attempts = MAX_ENCODE_ATTEMPTS
+        self.smallest: bytes | None = None
+
+    def encode(self, image: Image.Image, output_format: str, quality: int) -> bytes:
+        self.attempts += 1
+        data = _encode(image, output_format, quality)
+        if self.smallest is None or len(data) < len(self.smallest):
+            self.smallest = data
+        return data
+
+    @property
+    def exhausted(self) -> bool:
+        return self.attempts >= self.max_attempts
+
+    def search_quality(self, output_format: str, size_at_start: int) -> bytes | None:
+        """Highest quality in [MIN_QUALITY, START_QUALITY) that fits at full scale"""
+        # Size falls roughly linearly with quality between the two anchors
+        target_ratio = self.max_size / size_at_start
+        guess = int(MIN_QUALITY + (START_QUALITY - MIN_QUALITY) * (target_ratio - MIN_QUALITY_SIZE_RATIO)
+                    / (1 - MIN_QUALITY_SIZE_RATIO))
+        lo, hi = MIN_QUALITY, START_QUALITY - 1
+        best = None
+        while lo <= hi and not self.exhausted:
+            quality = min(max(guess, lo), hi) if guess is not None else (lo + hi) // 2
+            guess = None
+            data = self.encode(self.image, output_format, quality)
+            if len(data) <= self.max_size:
+                best, lo = data, quality + 1
+                if len(data) >= self.max_size * GOOD_ENOUGH_RATIO:
+                    break
+            else:
+                hi = quality - 1
+        return best
+
+    def search_scale(self, output_format: str, quality: int, size_at_full: int, min_scale: float) -> bytes | None:
+        """Largest scale in [min_scale, 1) that fits at the given quality"""
+        # Size follows the pixel count, so the scale that fits is about the square root of the size ratio
+        scale = max(min_scale, min(0.99, (self.max_size / size_at_full) ** 0.5 * SCALE_HEADROOM))
+        working_scale = min(1.0, scale * 1.25)
+        # Every attempt resizes this copy instead of the full size image
+        working = _resize(self.image, working_scale) if working_scale < 1.0 else self.image
+        lo, hi = min_scale, working_scale
+        best = None
+        while not self.exhausted:
+            data = self.encode(_resize(working, scale / working_scale), output_format, quality)
+            if len(data) <= self.max_size:
+                best, lo = data, scale
+                if len(data) >= self.max_size * GOOD_ENOUGH_RATIO:
+                    break
+            elif scale <= min_scale:
+                break
+            else:
+                hi = scale
+            if best is None:
+                # Nothing fits yet, step down by the measured size ratio
+                scale = max(min_scale, scale * (self.max_size / len(data)) ** 0.5 * SCALE_HEADROOM)
+            elif hi - lo < 0.02:
+                break
+            else:
+                scale = (lo + hi) / 2
+        return best
+
+
+def _compress_image_sync(image_data: bytes, max_size: int) -> Tuple[bytes, str]:
+    """
+    Compress image to be under max_size, runs in a worker process.
     Returns compressed image data and content type.
     """
     try:
@@ -60,59 +373,44 @@ async def compress_image(image_data: bytes, max_size: int = MAX_FILE_SIZE) -> Tu
         else:
             output_format = original_format
             content_type = f'image/{original_format.lower()}'
-        
-        # Start with high quality and reduce if needed
-        quality = 85
-        scale_factor = 1.0
-        
-        while True:
-            # Apply scaling if needed
-            if scale_factor < 1.0:
-                new_size = (int(image.size[0] * scale_factor), int(image.size[1] * scale_factor))
-                resized_image = image.resize(new_size, Image.Resampling.LANCZOS)
-            else:
-                resized_image = image
-            
-            # Save to bytes with current quality
-            output = BytesIO()
-            
-            if output_format == 'JPEG':
-                resized_image.save(output, format='JPEG', quality=quality, optimize=True)
-            elif output_format == 'PNG':
-                # PNG compression level (0-9, higher = more compression)
-                png_compress_level = min(9, int((100 - quality) / 10))
-                resized_image.save(output, format='PNG', compress_level=png_compress_level, optimize=True)
-            else:
-                # For other formats, try to save with optimization
-                resized_image.save(output, format=output_format, optimize=True)
-            
-            compressed_data = output.getvalue()
-            compressed_size = len(compressed_data)
-            
-            # If size is acceptable, return
-            if compressed_size <= max_size:
-                return compressed_data, content_type
-            
-            # If still too large, reduce quality or scale
-            if quality > 30:
-                quality -= 10
-            elif scale_factor > 0.5:
-                scale_factor -= 0.1
-            else:
-                # Last resort: force JPEG with low quality
-                if output_format != 'JPEG':
-                    output_format = 'JPEG'
-                    content_type = 'image/jpeg'
-                    if resized_image.mode != 'RGB':
-                        resized_image = resized_image.convert('RGB')
-                quality = max(20, quality - 5)
-                if quality <= 20 and compressed_size > max_size:
-                    # If still too large, reduce dimensions more aggressively
-                    scale_factor = 0.5
-                    new_size = (int(image.size[0] * scale_factor), int(image.size[1] * scale_factor))
-                    resized_image = image.resize(new_size, Image.Resampling.LANCZOS)
-                    quality = 30
-        
+
+        solver = _CompressionSolver(image, max_size)
+        data = solver.encode(image, output_format, START_QUALITY)
+        if len(data) <= max_size:
+            return data, content_type
+
+        if output_format != 'JPEG':
+            # Quality barely changes the size of other formats, only scale does.
+            # Half of the attempts are kept for the JPEG fallback.
+            solver.max_attempts = MAX_ENCODE_ATTEMPTS // 2
+            result = solver.search_scale(output_format, MIN_QUALITY, len(data), MIN_SCALE_BEFORE_JPEG)
+            if result is not None:
+                return result, content_type
+            # Last resort: force JPEG
+            output_format = 'JPEG'
+            content_type = 'image/jpeg'
+            if image.mode != 'RGB':
+                solver.image = image = image.convert('RGB')
+            solver.max_attempts = MAX_ENCODE_ATTEMPTS
+            # The smallest result must match the content type
+            solver.smallest = None
+            data = solver.encode(image, output_format, START_QUALITY)
+            if len(data) <= max_size:
+                return data, content_type
+
+        # Lower the quality first, unless even the lowest one is estimated too large
+        if len(data) * MIN_QUALITY_SIZE_RATIO <= max_size:
+            result = solver.search_quality(output_format, len(data))
+            if result is not None:
+                return result, content_type
+
+        result = solver.search_scale(output_format, MIN_QUALITY, int(len(data) * MIN_QUALITY_SIZE_RATIO), MIN_SCALE)
+        if result is not None:
+            return result, content_type
+
+        logger.warning(f"Image still above {max_size} bytes after {solver.attempts} encodes")
+        return solver.smallest, content_type
+
     except Exception as e:
         # If compression fails, return original data
         logger.error(f"Image compression error: {e}")
@@ -122,60 +420,93 @@ async def compress_image(image_data: bytes, max_size: int = MAX_FILE_SIZE) -> Tu
 async def upload_image(file: UploadFile = File(...)):
     """
     upload image to GCS, compressing to 5MB if necessary
+    images under the limit are streamed from the spooled upload, only larger ones are read into memory
     """
     try:
-        # Read file content
-        file_content = await file.read()
-        file_size = len(file_content)
-        
+        file_size = await _upload_size(file)
+
         # Compress if file is larger than 5MB
         if file_size > MAX_FILE_SIZE:
+            file_content = await file.read()
             compressed_content, content_type = await compress_image(file_content, MAX_FILE_SIZE)
-            file_content = compressed_content
-            logger.info(f"Image compressed from {file_size / 1024 / 1024:.2f}MB to {len(file_content) / 1024 / 1024:.2f}MB")
+            del file_content
+            logger.info(f"Image compressed from {file_size / 1024 / 1024:.2f}MB to {len(compressed_content) / 1024 / 1024:.2f}MB")
+            source, upload_size = BytesIO(compressed_content), len(compressed_content)
         else:
             content_type = file.content_type or 'image/jpeg'
-        
-        bucket = await get_bucket()
-        # create blob object (file object in GCS)
+            source, upload_size = file.file, file_size
+
         # use uuid to rename file, prevent file name conflict overwrite
         file_extension = str(file.filename).split('.')[-1] if '.' in str(file.filename) else 'jpg'
         file_name = f"{uuid.uuid4()}_{str(file.filename).split('.')[0]}.{file_extension}"
-        blob = bucket.blob(file_name)
-        
-        # upload compressed file from memory to GCS
-        blob.upload_from_string(file_content, content_type=content_type)
+
+        await get_image_storage().upload(source, file_name, content_type, size=upload_size)
+        # The image is known to exist now, its first view needs no existence check
+        try:
+            await _sign_image_url(file_name)
+        except Exception as e:
+            logger.warning(f"Signing url of uploaded image {file_name} failed: {e}")
 
         return UploadSuccessResponse(
             status="success",
             filename=file_name,
             message="file uploaded successfully"
         )
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Upload error: {e}")
         raise HTTPException(status_code=500, detail="file upload failed")
 
 
+async def _upload_size(file: UploadFile) -> int:
+    """Size of the upload without reading it, the file is left at its start"""
+    if file.size is None:
+        file.size = await asyncio.to_thread(file.file.seek, 0, os.SEEK_END)
+    await file.seek(0)
+    return file.size
+
+
 async def get_image_url(filename: str):
     """
-    get image url from GCS
+    get image url from the storage backend
     the frontend can use this url to display the image
     """
     try:
-        bucket = await get_bucket()
-        blob = bucket.blob(filename)
-        
-        if not blob.exists():
+        signed_url = await resolve_image_url(filename)
+        if signed_url is None:
             raise HTTPException(status_code=404, detail="image not found")
-            
-        # generate signed url with very long expiration (effectively no time limit)
-        signed_url = blob.generate_signed_url(
-            version="v4",
-            expiration=timedelta(days=3650),  # 10 years - effectively no expiration
-            method="GET"
-        )
-        
+
         return ImageUrlResponse(url=signed_url)
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"get image url failed: {str(e)}")
 
+
+async def get_image_urls(filenames: list[str]):
+    """
+    get the urls of many images at once, e.g. the gallery of an item
+    images that don't exist are left out of the result
+    """
+    try:
+        unique = list(dict.fromkeys(filenames))
+        urls = await asyncio.gather(*(resolve_image_url(filename) for filename in unique))
+        return ImageUrlsResponse(urls={filename: url for filename, url in zip(unique, urls) if url is not None})
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"get image urls failed: {str(e)}")
+
+
+async def get_local_image(filename: str, expires: int, signature: str):
+    """
+    serve an image of the local backend from a signed url
+    """
+    image_storage = get_image_storage()
+    if not isinstance(image_storage, LocalImageStorage):
+        raise HTTPException(status_code=404, detail="image not found")
+    if not image_storage.verify(filename, expires, signature):
+        raise HTTPException(status_code=403, detail="invalid or expired image url")
+    if not await image_storage.exists(filename):
+        raise HTTPException(status_code=404, detail="image not found")
+    media_type = mimetypes.guess_type(filename)[0] or "application/octet-stream"
+    return StreamingResponse(image_storage.iter_file(filename), media_type=media_type)
@@ -0,0 +1,161 @@
+import asyncio
+import hashlib
+import hmac
+import mmap
+import os
+import secrets
+import shutil
+import time
+from abc import ABC, abstractmethod
+from datetime import timedelta
+from typing import BinaryIO, Iterator
+from urllib.parse import quote, urlencode
+
+from google.api_core.exceptions import NotFound
+from google.cloud import storage
+from google.oauth2 import service_account
+
+
+# Uploads are sent in chunks of this size, GCS needs a multiple of 256KB
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+
+
+class ImageStorage(ABC):
+    """Where uploaded images are kept"""
+
+    @abstractmethod
+    async def upload(self, source: BinaryIO, filename: str, content_type: str, size: int | None = None) -> None:
+        """
+        Store an image, reading the source in chunks so it is never held in memory as a whole
+        Args:
+            source:         file object positioned at the start of the image
+            filename:       name of the stored image
+            content_type:   mime type of the image
+            size:           length of the image in bytes, if known, lets a backend pick how to upload it
+        """
+
+    @abstractmethod
+    async def exists(self, filename: str) -> bool:
+        ...
+
+    @abstractmethod
+    async def signed_url(self, filename: str, expires_in: timedelta) -> str:
+        """
+        URL the frontend can fetch the image from without credentials
+        Args:
+            filename:   name of the stored image
+            expires_in: how long the URL stays valid
+
+        Returns:        the signed URL
+        """
+
+    @abstractmethod
+    async def delete(self, filename: str) -> None:
+        """Remove an image, deleting a missing image is not an error"""
+
+
+class GCSImageStorage(ImageStorage):
+    """Images in a Google Cloud Storage bucket"""
+
+    def __init__(self, bucket):
+        self.bucket = bucket
+
+    @classmethod
+    def from_credentials_file(cls, credentials_file: str | None, bucket_name: str | None) -> "GCSImageStorage":
+        if not credentials_file or not os.path.exists(credentials_file):
+            raise FileNotFoundError(f"Credentials file not found: {credentials_file}")
+        credentials = service_account.Credentials.from_service_account_file(credentials_file)
+        return cls(storage.Client(credentials=credentials).bucket(bucket_name))
+
+    async def upload(self, source: BinaryIO, filename: str, content_type: str, size: int | None = None) -> None:
+        blob = self.bucket.blob(filename)
+        if size is None or size > UPLOAD_CHUNK_SIZE:
+            # With a known size up to 8MB the client does a multipart upload, which reads the whole
+            # file into memory. Leaving the size out forces a resumable upload sent chunk by chunk.
+            blob.chunk_size = UPLOAD_CHUNK_SIZE
+            size = None
+        # Otherwise one multipart request replaces the two or three of a resumable upload,
+        # the copies of the file it holds are bounded by the chunk size.
+        # The client library blocks, it runs in a thread so the event loop keeps serving requests
+        await asyncio.to_thread(blob.upload_from_file, source, size=size, content_type=content_type)
+
+    async def exists(self, filename: str) -> bool:
+        return await asyncio.to_thread(self.bucket.blob(filename).exists)
+
+    async def signed_url(self, filename: str, expires_in: timedelta) -> str:
+        blob = self.bucket.blob(filename)
+        return await asyncio.to_thread(blob.generate_signed_url, version="v4", expiration=expires_in, method="GET")
+
+    async def delete(self, filename: str) -> None:
+        try:
+            await asyncio.to_thread(self.bucket.blob(filename).delete)
+        except NotFound:
+            pass
+
+
+class LocalImageStorage(ImageStorage):
+    """
+    Images in a directory, stands in for GCS in development and load tests.
+    Signed URLs point at /image/file/{filename} and carry an HMAC of the
+    filename and expiry, so they can be checked without any stored state.
+    """
+
+    def __init__(self, root: str, signing_key: bytes | None = None, base_url: str = ""):
+        self.root = root
+        # Without a configured key the URLs only stay valid until the process restarts
+        self.signing_key = signing_key or secrets.token_bytes(32)
+        self.base_url = base_url.rstrip("/")
+        os.makedirs(root, exist_ok=True)
+
+    def _path(self, filename: str) -> str:
+        return os.path.join(self.root, os.path.basename(filename))
+
+    def _write(self, source: BinaryIO, filename: str) -> None:
+        path = self._path(filename)
+        partial = f"{path}.part"
+        with open(partial, "wb") as target:
+            shutil.copyfileobj(source, target, UPLOAD_CHUNK_SIZE)
+        # Readers never see a half written image
+        os.replace(partial, path)
+
+    async def upload(self, source: BinaryIO, filename: str, content_type: str, size: int | None = None) -> None:
+        await asyncio.to_thread(self._write, source, filename)
+
+    async def exists(self, filename: str) -> bool:
+        return os.path.isfile(self._path(filename))
+
+    def _signature(self, filename: str, expires: int) -> str:
+        message = f"{filename}:{expires}".encode("utf-8")
+        return hmac.new(self.signing_key, message, hashlib.sha256).hexdigest()
+
+    async def signed_url(self, filename: str, expires_in: timedelta) -> str:
+        expires = int(time.time() + expires_in.total_seconds())
+        query = urlencode({"expires": expires, "signature": self._signature(filename, expires)})
+        return f"{self.base_url}/image/file/{quote(filename)}?{query}"
+
+    def verify(self, filename: str, expires: int, signature: str) -> bool:
+        """Whether a signed URL was issued by this storage and has not expired"""
+        if expires < time.time():
+            return False
+        return hmac.compare_digest(self._signature(filename, expires), signature)
+
+    def iter_file(self, filename: str) -> Iterator[bytes]:
+        """
+        Read an image through a memory map, chunk by chunk
+        Args:
+            filename:   name of the stored image
+
+        Returns:        iterator over the content, meant for a StreamingResponse
+        """
+        with open(self._path(filename), "rb") as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                return
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                for offset in range(0, len(mapped), UPLOAD_CHUNK_SIZE):
+                    yield mapped[offset:offset + UPLOAD_CHUNK_SIZE]
+
+    async def delete(self, filename: str) -> None:
+        try:
+            os.remove(self._path(filename))
+        except FileNotFoundError:
+            pass
@@ -1,23 +1,30 @@
 from fastapi import HTTPException
-from sqlmodel import select
+from sqlmodel import exists, select
 from sqlmodel.ext.asyncio.session import AsyncSession
 
 from app.models.po.item_address_po import ItemAddress
+from app.utils.db_connection import insert_ignore, release_connection
 
 # Item-Address: Many-to-One
 
+@release_connection
 async def create_item_address_relation(
         session: AsyncSession,
         item_id: str,
         address_id: str,
 ) -> ItemAddress:
-    item_address = ItemAddress(item_id=item_id, address_id=address_id)
-    session.add(item_address)
+    """Create the relation, or get it if it already exists"""
+    await insert_ignore(session, ItemAddress(item_id=item_id, address_id=address_id))
     await session.commit()
-    await session.refresh(item_address)
-    return item_address
+    statement = select(ItemAddress).where(
+        ItemAddress.item_id == item_id,
+        ItemAddress.address_id == address_id
+    )
+    result = await session.exec(statement)
+    return result.one()
 
 
+@release_connection
 async def get_item_address(
         session: AsyncSession,
         item_id: str,
@@ -30,6 +37,7 @@ async def get_item_address(
     return item_address.address_id
 
 
+@release_connection
 async def get_address_items(
         session: AsyncSession,
         address_id: str,
@@ -53,15 +61,15 @@ async def delete_item_address_relation(
     await session.commit()
 
 
+@release_connection
 async def verify_item_address_relation(
         session: AsyncSession,
         item_id: str,
         address_id: str,
 ) -> bool:
-    statement = select(ItemAddress).where(
+    statement = select(exists().where(
         ItemAddress.item_id == item_id,
         ItemAddress.address_id == address_id
-    )
+    ))
     result = await session.exec(statement)
-    item_address = result.first()
-    return item_address is not None
+    return bool(result.one())
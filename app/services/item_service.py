@@ -1,22 +1,71 @@
-from fastapi import status
-from fastapi.exceptions import HTTPException
 from uuid import UUID
+import asyncio
 import logging
+import os
 
-from app.client.user.user_address_api_client.api.default import (
-    get_address_addresses_address_id_get,
-    get_user_users_user_id_get
-)
-from app.client.item.item_api_client.models import HTTPValidationError
 from app.models.dto.item_dto import (
     ItemRead,
 )
-from app.services.item_user_repository import get_item_owner
-from app.utils.db_connection import SessionDep
+from app.services.address_service import get_address
+from app.services.user_service import get_public_user
 
 
 log = logging.getLogger(__name__)
 
+# Upper bound of concurrent downstream requests issued while enriching one page
+ENRICH_MAX_CONCURRENCY = int(os.getenv("ENRICH_MAX_CONCURRENCY", "10"))
+
+
+async def _load_many(keys, fetch, client, semaphore: asyncio.Semaphore) -> dict:
+    """Fetch every key once, with at most `semaphore` requests in flight"""
+    async def _load(key):
+        async with semaphore:
+            return key, await fetch(key, client)
+
+    return dict(await asyncio.gather(*[_load(key) for key in keys]))
+
+
+async def complete_items(
+        item_objs: list,
+        user_ids: list[UUID | None],
+        client,
+) -> list[ItemRead]:
+    """
+    Insert address and user information into a page of ItemRead.
+    Each distinct address and user is fetched only once for the whole page.
+    Args:
+        item_objs:  client attrs models, or item dicts of the same shape
+        user_ids:   id for user of each item, in the same order as item_objs
+        client:     client for address and user
+
+    Returns:        list of ItemRead pydantic models
+    """
+    item_dicts = [item_obj if isinstance(item_obj, dict) else item_obj.to_dict() for item_obj in item_objs]
+    address_ids = [
+        UUID(str(item_dict["address_UUID"])) if item_dict.get("address_UUID") else None
+        for item_dict in item_dicts
+    ]
+
+    user_ids = [UUID(str(u_id)) if u_id else None for u_id in user_ids]
+
+    semaphore = asyncio.Semaphore(ENRICH_MAX_CONCURRENCY)
+    addresses, users = await asyncio.gather(
+        _load_many({a_id for a_id in address_ids if a_id}, get_address, client, semaphore),
+        _load_many({u_id for u_id in user_ids if u_id}, get_public_user, client, semaphore),
+    )
+
+    result_items = []
+    for item_dict, addr_id, user_id in zip(item_dicts, address_ids, user_ids):
+        # Insert address information
+        if addr_id and addresses.get(addr_id) is not None:
+            item_dict["address"] = addresses[addr_id]
+        # Insert user information
+        if user_id and users.get(user_id) is not None:
+            item_dict["user"] = users[user_id]
+        result_items.append(ItemRead(**item_dict))
+
+    return result_items
+
 
 async def complete_item(
         item_obj,
@@ -26,50 +75,10 @@ async def complete_item(
     """
     Insert address and user information into ItemRead
     Args:
-        item_obj:   client attrs model
+        item_obj:   client attrs model, or item dict of the same shape
         user_id:    id for user of the item
         client:     client for address and user
 
     Returns:        ItemRead pydantic model
     """
-    item_dict = item_obj.to_dict()
-    addr_id = item_dict.get("address_UUID")
-
-    # Insert address information
-    if addr_id:
-        address_response = await get_address_addresses_address_id_get.asyncio(
-            address_id=UUID(str(addr_id)),
-            client=client
-        )
-
-        if isinstance(address_response, HTTPValidationError):
-            log.error(
-                "Downstream 'user service (address)' validation failed. Response: %s",
-                address_response.to_dict()
-            )
-            raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail="An internal error occurred."
-            )
-        if address_response is not None:
-            item_dict["address"] = address_response.to_dict()
-
-    # Insert user information
-    if user_id:
-        user_response = await get_user_users_user_id_get.asyncio(
-            user_id=user_id,
-            client=client
-        )
-        if isinstance(user_response, HTTPValidationError):
-            log.error(
-                "Downstream 'user service' validation failed. Response: %s",
-                user_response.to_dict()
-            )
-            raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail="An internal error occurred."
-            )
-        if user_response is not None:
-            item_dict["user"] = user_response.to_dict()
-
-    return ItemRead(**item_dict)
\ No newline at end of file
+    return (await complete_items([item_obj], [user_id], client))[0]
@@ -0,0 +1,161 @@
+from datetime import datetime
+from typing import Optional
+
+from sqlmodel import delete, func, select, update
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.models.po.item_summary_po import ItemSummary
+from app.models.po.read_model_backfill_po import ReadModelBackfill
+from app.utils.db_connection import insert_ignore, release_connection, pin_primary, read_from_replica
+
+# Item read-model: one summary row per item
+
+@release_connection
+async def upsert_item_summary(
+        session: AsyncSession,
+        summary: ItemSummary,
+) -> None:
+    """Insert the summary of an item, or overwrite the stored one, keeping its owner if none is given"""
+    summary.updated_at = datetime.now()
+    if not await insert_ignore(session, summary):
+        exclude = {"id", "created_at"}
+        if summary.user_id is None:
+            exclude.add("user_id")
+        values = summary.model_dump(exclude=exclude)
+        await session.exec(
+            update(ItemSummary)
+            .where(ItemSummary.item_id == summary.item_id)
+            .values(**values)
+        )
+    await session.commit()
+    pin_primary(summary.user_id)
+
+
+@release_connection
+async def mark_item_summary_fresh(
+        session: AsyncSession,
+        item_id: str,
+) -> None:
+    """Record that the stored summary still matches the item service"""
+    await mark_item_summaries_fresh(session, [item_id])
+
+
+@release_connection
+async def mark_item_summaries_fresh(
+        session: AsyncSession,
+        item_ids: list[str],
+) -> None:
+    """Record that the stored summaries still match the item service"""
+    await session.exec(
+        update(ItemSummary)
+        .where(ItemSummary.item_id.in_(item_ids))
+        .values(updated_at=datetime.now())
+    )
+    await session.commit()
+
+
+@release_connection
+@read_from_replica
+async def get_item_summary(
+        session: AsyncSession,
+        item_id: str,
+) -> Optional[ItemSummary]:
+    statement = select(ItemSummary).where(ItemSummary.item_id == item_id)
+    result = await session.exec(statement)
+    return result.first()
+
+
+@release_connection
+@read_from_replica
+async def list_item_summaries(
+        session: AsyncSession,
+        item_ids: Optional[list[str]] = None,
+        transaction_type: Optional[str] = None,
+        search: Optional[str] = None,
+        skip: int = 0,
+        limit: int = 10,
+) -> list[ItemSummary]:
+    """Get a page of summaries, newest items first"""
+    statement = select(ItemSummary)
+    if item_ids is not None:
+        statement = statement.where(ItemSummary.item_id.in_(item_ids))
+    if transaction_type is not None:
+        statement = statement.where(ItemSummary.transaction_type == transaction_type)
+    if search:
+        # % and _ in the search match themselves, not any characters
+        statement = statement.where(func.lower(ItemSummary.title).contains(search.lower(), autoescape=True))
+    statement = (
+        statement
+        .order_by(ItemSummary.item_created_at.desc(), ItemSummary.id.desc())
+        .offset(skip)
+        .limit(limit)
+    )
+    result = await session.exec(statement)
+    return list(result.all())
+
+
+@release_connection
+async def delete_item_summary(
+        session: AsyncSession,
+        item_id: str,
+) -> None:
+    await session.exec(delete(ItemSummary).where(ItemSummary.item_id == item_id))
+    await session.commit()
+
+
+@release_connection
+async def is_backfill_complete(
+        session: AsyncSession,
+        name: str,
+) -> bool:
+    statement = select(ReadModelBackfill.completed_at).where(ReadModelBackfill.name == name)
+    result = await session.exec(statement)
+    return result.first() is not None
+
+
+@release_connection
+async def claim_backfill(
+        session: AsyncSession,
+        name: str,
+        stale_before: datetime,
+) -> bool:
+    """
+    Take over a backfill unless it is complete or another instance is running it
+    Args:
+        session:        database session
+        name:           name of the read-model
+        stale_before:   a running backfill without a heartbeat since then is taken over
+
+    Returns:            whether this instance should run the backfill
+    """
+    if await insert_ignore(session, ReadModelBackfill(name=name)):
+        await session.commit()
+        return True
+    result = await session.execute(
+        update(ReadModelBackfill)
+        .where(
+            ReadModelBackfill.name == name,
+            ReadModelBackfill.completed_at.is_(None),
+            ReadModelBackfill.heartbeat_at < stale_before,
+        )
+        .values(heartbeat_at=datetime.now())
+    )
+    await session.commit()
+    return result.rowcount > 0
+
+
+@release_connection
+async def heartbeat_backfill(
+        session: AsyncSession,
+        name: str,
+        completed: bool = False,
+) -> None:
+    values = {"heartbeat_at": datetime.now()}
+    if completed:
+        values["completed_at"] = values["heartbeat_at"]
+    await session.exec(
+        update(ReadModelBackfill)
+        .where(ReadModelBackfill.name == name)
+        .values(**values)
+    )
+    await session.commit()
@@ -0,0 +1,337 @@
+from datetime import datetime, timedelta
+from fastapi import status
+from fastapi.exceptions import HTTPException
+from uuid import UUID
+import asyncio
+import logging
+import os
+
+import httpx
+
+from app.client.item.item_api_client.api.items import get_item_items_item_id_get, list_items_items_get
+from app.client.item.item_api_client.models import HTTPValidationError
+from app.client.item.item_api_client.types import UNSET
+from app.models.po.item_summary_po import ItemSummary
+from app.services.address_service import get_address
+from app.services.item_summary_repository import (
+    claim_backfill,
+    delete_item_summary,
+    get_item_summary,
+    heartbeat_backfill,
+    is_backfill_complete,
+    list_item_summaries,
+    mark_item_summaries_fresh,
+    mark_item_summary_fresh,
+    upsert_item_summary,
+)
+from app.services.item_user_repository import get_item_owner, get_item_owners_batch
+from app.utils.db_connection import new_session
+from app.utils.singleflight import single_flight
+
+
+log = logging.getLogger(__name__)
+
+# Serve /items listings from the local read-model instead of the item service
+ITEM_READ_MODEL_ENABLED = os.getenv("ITEM_READ_MODEL_ENABLED", "false").strip().lower() in ("1", "true", "yes", "on")
+# A stored summary older than this is checked against the item service before it is served,
+# one batch request per listing page holding any. Items changed or deleted directly in the
+# item service show up in listings after at most this long.
+ITEM_SUMMARY_MAX_AGE = float(os.getenv("ITEM_SUMMARY_MAX_AGE", "60"))
+ITEM_SUMMARY_BACKFILL_PAGE_SIZE = 100
+# The items are copied once per database, an instance that stops copying for this long is taken over
+ITEM_SUMMARY_BACKFILL_STALE_AFTER = float(os.getenv("ITEM_SUMMARY_BACKFILL_STALE_AFTER", "300"))
+ITEM_SUMMARY_BACKFILL_POLL_INTERVAL = 10
+ITEM_SUMMARY_BACKFILL_NAME = "item_summary"
+
+# Listings are only complete once the backfill has copied the existing items
+_read_model_ready = False
+
+# A popular item is requested by many pages at once, they share one upstream GET
+fetch_item = single_flight("get_item", get_item_items_item_id_get.asyncio)
+
+
+def _value(value):
+    return None if value is UNSET else value
+
+
+def build_item_summary(item_obj, user_id: str | None, address: dict | None) -> ItemSummary:
+    """Project a client ItemRead onto a summary row"""
+    address_id = _value(item_obj.address_uuid)
+    created_at = _value(item_obj.created_at)
+    updated_at = _value(item_obj.updated_at)
+    categories = _value(item_obj.categories)
+    return ItemSummary(
+        item_id=str(item_obj.item_uuid),
+        user_id=str(user_id) if user_id else None,
+        title=item_obj.title,
+        description=_value(item_obj.description),
+        price=item_obj.price,
+        condition=str(item_obj.condition),
+        transaction_type=str(item_obj.transaction_type),
+        address_id=str(address_id) if address_id else None,
+        address_city=address.get("city") if address else None,
+        image_urls=_value(item_obj.image_urls),
+        categories=[category.to_dict() for category in categories] if categories is not None else None,
+        item_created_at=created_at,
+        etag=updated_at.isoformat() if updated_at else None,
+    )
+
+
+def summary_to_item_dict(summary: ItemSummary) -> dict:
+    """Item dict in the shape of the client ItemRead.to_dict()"""
+    item_dict = {
+        "item_UUID": summary.item_id,
+        "title": summary.title,
+        "price": summary.price,
+        "condition": summary.condition,
+        "transaction_type": summary.transaction_type,
+    }
+    optional = {
+        "description": summary.description,
+        "address_UUID": summary.address_id,
+        "image_urls": summary.image_urls,
+        "categories": summary.categories,
+        "created_at": summary.item_created_at.isoformat() if summary.item_created_at else None,
+        "updated_at": summary.etag,
+    }
+    item_dict.update({key: value for key, value in optional.items() if value is not None})
+    return item_dict
+
+
+async def store_item_summary(
+        session,
+        item_obj,
+        user_id: str | None,
+        client,
+) -> ItemSummary:
+    """
+    Write the summary of an item that was just read or changed in the item service
+    Args:
+        session:    database session
+        item_obj:   client ItemRead
+        user_id:    id of the owner
+        client:     client for address
+
+    Returns:        the stored summary
+    """
+    address = None
+    address_id = _value(item_obj.address_uuid)
+    if address_id:
+        try:
+            address = await get_address(UUID(str(address_id)), client)
+        except Exception as e:
+            log.warning("Address %s of item %s could not be fetched: %s", address_id, item_obj.item_uuid, e)
+    summary = build_item_summary(item_obj, user_id, address)
+    await upsert_item_summary(session, summary)
+    return summary
+
+
+async def _fetch_item(item_client, item_id: UUID):
+    item_response = await fetch_item(client=item_client, item_id=item_id)
+    if isinstance(item_response, HTTPValidationError):
+        log.error(
+            "Downstream 'item service' validation failed for GET /items/%s. Response: %s",
+            item_id,
+            item_response.to_dict()
+        )
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="An internal error occurred."
+        )
+    return item_response
+
+
+async def get_item_with_owner(
+        session,
+        item_id: UUID,
+        item_client,
+        user_client,
+) -> tuple[dict, str | None] | None:
+    """
+    Get an item from the read-model, falling back to the item service.
+    A stale summary is rewritten only when the item's ETag changed, and is still
+    served if the item service cannot be reached.
+    With the read-model disabled the item service is always asked and nothing is written.
+    Args:
+        session:        database session
+        item_id:        id of the item
+        item_client:    client for item
+        user_client:    client for address
+
+    Returns:            (item dict, owner id), None if the item doesn't exist
+    """
+    if not ITEM_READ_MODEL_ENABLED:
+        item_response = await _fetch_item(item_client, item_id)
+        if item_response is None:
+            return None
+        return item_response.to_dict(), await get_item_owner(session, str(item_response.item_uuid))
+
+    summary = await get_item_summary(session, str(item_id))
+    if summary is not None and _is_fresh(summary):
+        return summary_to_item_dict(summary), summary.user_id
+
+    try:
+        item_response = await _fetch_item(item_client, item_id)
+    except httpx.HTTPError as e:
+        if summary is None:
+            raise
+        log.warning("Item service unreachable, serving stored summary of item %s: %s", item_id, e)
+        return summary_to_item_dict(summary), summary.user_id
+
+    if item_response is None:
+        if summary is not None:
+            await delete_item_summary(session, str(item_id))
+        return None
+
+    updated_at = _value(item_response.updated_at)
+    if summary is not None and updated_at and summary.etag == updated_at.isoformat():
+        await mark_item_summary_fresh(session, summary.item_id)
+        return summary_to_item_dict(summary), summary.user_id
+
+    user_id = summary.user_id if summary is not None else await get_item_owner(session, str(item_response.item_uuid))
+    summary = await store_item_summary(session, item_response, user_id, user_client)
+    return summary_to_item_dict(summary), user_id
+
+
+def _is_fresh(summary: ItemSummary) -> bool:
+    return datetime.now() - summary.updated_at < timedelta(seconds=ITEM_SUMMARY_MAX_AGE)
+
+
+async def _refresh_item_summaries(session, summaries: list[ItemSummary], item_client, user_client) -> bool:
+    """
+    Check stale summaries against the item service in one request, rewriting changed
+    ones and deleting those of removed items. They stay as they are if it can't be reached.
+    Returns:    whether any summary was rewritten or deleted
+    """
+    try:
+        items = await list_items_items_get.asyncio(
+            client=item_client,
+            id=[UUID(summary.item_id) for summary in summaries],
+            limit=len(summaries),
+        )
+    except httpx.HTTPError as e:
+        log.warning("Item service unreachable, serving %s stale summaries: %s", len(summaries), e)
+        return False
+    if items is None or isinstance(items, HTTPValidationError):
+        log.warning("Item service did not list %s stale summaries, serving them as they are", len(summaries))
+        return False
+
+    current = {str(item.item_uuid): item for item in items}
+    unchanged = []
+    changed = False
+    for summary in summaries:
+        item = current.get(summary.item_id)
+        updated_at = _value(item.updated_at) if item is not None else None
+        if item is None:
+            await delete_item_summary(session, summary.item_id)
+            changed = True
+        elif updated_at and summary.etag == updated_at.isoformat():
+            unchanged.append(summary.item_id)
+        else:
+            await store_item_summary(session, item, summary.user_id, user_client)
+            changed = True
+    if unchanged:
+        await mark_item_summaries_fresh(session, unchanged)
+    return changed
+
+
+async def list_items_from_read_model(
+        session,
+        item_client,
+        user_client,
+        item_ids: list[UUID] | None = None,
+        category_id: int | None = None,
+        transaction_type=None,
+        search: str | None = None,
+        skip: int = 0,
+        limit: int = 10,
+) -> list[ItemSummary] | None:
+    """
+    Get a page of item summaries, newest first.
+    Summaries older than ITEM_SUMMARY_MAX_AGE are checked against the item service first.
+    Args:
+        session:        database session
+        item_client:    client for item
+        user_client:    client for address
+
+    Returns:            the summaries, None when the read-model can't answer the query
+                        and the item service has to be asked instead
+    """
+    if not ITEM_READ_MODEL_ENABLED or not _read_model_ready or category_id is not None:
+        return None
+
+    async def _list() -> list[ItemSummary]:
+        return await list_item_summaries(
+            session,
+            item_ids=[str(i_id) for i_id in item_ids] if item_ids else None,
+            transaction_type=str(transaction_type) if transaction_type is not None else None,
+            search=search,
+            skip=skip,
+            limit=limit,
+        )
+
+    summaries = await _list()
+    stale = [summary for summary in summaries if not _is_fresh(summary)]
+    # A rewritten or deleted item can move others into or out of the page
+    if stale and await _refresh_item_summaries(session, stale, item_client, user_client):
+        summaries = await _list()
+    # Items that reached the item service but not the read-model yet
+    if item_ids and len(summaries) < min(len(set(item_ids)), limit):
+        return None
+    return summaries
+
+
+async def _copy_item_summaries(session, item_client, user_client) -> bool:
+    """Copy every item of the item service into the read-model, return whether all were copied"""
+    skip = 0
+    while True:
+        items = await list_items_items_get.asyncio(
+            client=item_client,
+            skip=skip,
+            limit=ITEM_SUMMARY_BACKFILL_PAGE_SIZE,
+        )
+        if items is None or isinstance(items, HTTPValidationError):
+            log.error("Item read-model backfill stopped at offset %s, listings keep using the item service", skip)
+            return False
+        owners_map = await get_item_owners_batch(session, [str(item.item_uuid) for item in items])
+        for item in items:
+            await store_item_summary(session, item, owners_map.get(str(item.item_uuid)), user_client)
+        await heartbeat_backfill(session, ITEM_SUMMARY_BACKFILL_NAME)
+        if len(items) < ITEM_SUMMARY_BACKFILL_PAGE_SIZE:
+            break
+        skip += len(items)
+    log.info("Item read-model backfilled with %s items", skip + len(items))
+    return True
+
+
+async def backfill_item_summaries(item_client, user_client) -> None:
+    """
+    Enable listings from the read-model once it holds every item.
+    The first instance on a database copies the items, later ones only wait for
+    the copy to complete, webhooks keep the read-model in sync after that.
+    """
+    global _read_model_ready
+    async with new_session() as session:
+        while not await is_backfill_complete(session, ITEM_SUMMARY_BACKFILL_NAME):
+            stale_before = datetime.now() - timedelta(seconds=ITEM_SUMMARY_BACKFILL_STALE_AFTER)
+            if await claim_backfill(session, ITEM_SUMMARY_BACKFILL_NAME, stale_before):
+                if not await _copy_item_summaries(session, item_client, user_client):
+                    return
+                await heartbeat_backfill(session, ITEM_SUMMARY_BACKFILL_NAME, completed=True)
+                break
+            await asyncio.sleep(ITEM_SUMMARY_BACKFILL_POLL_INTERVAL)
+    _read_model_ready = True
+
+
+def start_item_read_model(item_client, user_client) -> asyncio.Task | None:
+    """Start the backfill in the background when the read-model is enabled"""
+    if not ITEM_READ_MODEL_ENABLED:
+        return None
+    task = asyncio.create_task(backfill_item_summaries(item_client, user_client))
+    task.add_done_callback(_log_backfill_failure)
+    return task
+
+
+def _log_backfill_failure(task: asyncio.Task) -> None:
+    if not task.cancelled() and task.exception() is not None:
+        log.error("Item read-model backfill failed: %s", task.exception())
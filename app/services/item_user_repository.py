@@ -1,36 +1,51 @@
+from typing import Optional
+
 from fastapi import HTTPException
-from sqlmodel import select
+from sqlmodel import exists, select
 from sqlmodel.ext.asyncio.session import AsyncSession
 import logging
 
 from app.models.po.item_user_po import ItemUser
+from app.utils.db_connection import insert_ignore, release_connection, pin_primary, read_from_replica
+from app.utils.pagination import apply_keyset, keyset_page
 
 # Item-User: Many-to-One
 
 log = logging.getLogger(__name__)
 
+@release_connection
 async def create_item_user_relation(
         session: AsyncSession,
         item_id: str,
         user_id: str,
 ) -> ItemUser:
-    item_user = ItemUser(item_id=item_id, user_id=user_id)
-    session.add(item_user)
+    """Create the relation, or get it if it already exists"""
+    await insert_ignore(session, ItemUser(item_id=item_id, user_id=user_id))
     await session.commit()
-    await session.refresh(item_user)
-    return item_user
+    pin_primary(user_id)
+    statement = select(ItemUser).where(
+        ItemUser.item_id == item_id,
+        ItemUser.user_id == user_id
+    )
+    result = await session.exec(statement)
+    return result.one()
 
 
+@release_connection
+@read_from_replica
 async def get_item_owners_batch(
         session: AsyncSession,
         item_ids: list[str]
 ) -> dict[str, str]:
     """Get user_id for multiple item_id"""
+    if not item_ids:
+        return {}
     stmt = select(ItemUser.item_id, ItemUser.user_id).where(ItemUser.item_id.in_(item_ids))
     result = await session.exec(stmt)
     return {row.item_id: row.user_id for row in result.all()}
 
 
+@release_connection
 async def get_item_owner(
         session: AsyncSession,
         item_id: str,
@@ -45,21 +60,23 @@ async def get_item_owner(
     return item_user.user_id
 
 
+@release_connection
+@read_from_replica
 async def get_user_items(
         session: AsyncSession,
         user_id: str,
-        skip: int = 0,
         limit: int = 10,
-) -> list[str]:
-    statement = (
-        select(ItemUser)
-        .where(ItemUser.user_id == user_id)
-        .offset(skip)
-        .limit(limit)
-    )
+        cursor: Optional[str] = None,
+        skip: int = 0,
+) -> tuple[list[str], Optional[str]]:
+    """Get a page of item_ids of a user, newest first, and the cursor of the next page"""
+    statement = select(ItemUser).where(ItemUser.user_id == user_id)
+    statement = apply_keyset(statement, ItemUser, limit, cursor)
+    if skip and not cursor:
+        statement = statement.offset(skip)
     result = await session.exec(statement)
-    item_users = result.all()
-    return [item_user.item_id for item_user in item_users]
+    item_users, next_cursor = keyset_page(result.all(), limit)
+    return [item_user.item_id for item_user in item_users], next_cursor
 
 
 async def delete_item_user_relation(
@@ -75,15 +92,15 @@ async def delete_item_user_relation(
     await session.commit()
 
 
+@release_connection
 async def verify_item_ownership(
         session: AsyncSession,
         item_id: str,
         user_id: str,
 ) -> bool:
-    statement = select(ItemUser).where(
+    statement = select(exists().where(
         ItemUser.item_id == item_id,
         ItemUser.user_id == user_id
-    )
+    ))
     result = await session.exec(statement)
-    item_user = result.first()
-    return item_user is not None
+    return bool(result.one())
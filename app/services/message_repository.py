@@ -1,23 +1,33 @@
+from typing import Optional
+
 from fastapi import HTTPException
 from sqlmodel import select
 from sqlmodel.ext.asyncio.session import AsyncSession
 
 from app.models.po.thread_user_po import ThreadUser
+from app.utils.db_connection import insert_ignore, release_connection, pin_primary, read_from_replica
+from app.utils.pagination import apply_keyset, keyset_page
 
 
+@release_connection
 async def create_thread_user_relation(
         session: AsyncSession,
         thread_id: str,
         user_id: str,
 ) -> ThreadUser:
 
-    relation = ThreadUser(thread_id=thread_id, user_id=user_id)
-    session.add(relation)
+    await insert_ignore(session, ThreadUser(thread_id=thread_id, user_id=user_id))
     await session.commit()
-    await session.refresh(relation)
-    return relation
+    pin_primary(user_id)
+    statement = select(ThreadUser).where(
+        ThreadUser.thread_id == thread_id,
+        ThreadUser.user_id == user_id
+    )
+    result = await session.exec(statement)
+    return result.one()
 
 
+@release_connection
 async def get_thread_users(
         session: AsyncSession,
         thread_id: str,
@@ -34,18 +44,23 @@ async def get_thread_users(
 
     return [rel.user_id for rel in relations]
 
+@release_connection
+@read_from_replica
 async def get_user_threads(
         session: AsyncSession,
         user_id: str,
-) -> list[str]:
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None,
+) -> tuple[list[str], Optional[str]]:
 
     statement = select(ThreadUser).where(
         ThreadUser.user_id == user_id
     )
+    statement = apply_keyset(statement, ThreadUser, limit, cursor)
     result = await session.exec(statement)
-    relations = result.all()
+    relations, next_cursor = keyset_page(result.all(), limit)
 
-    return [rel.thread_id for rel in relations]
+    return [rel.thread_id for rel in relations], next_cursor
 
 async def delete_thread_user_relations(
         session: AsyncSession,
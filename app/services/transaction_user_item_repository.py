@@ -1,14 +1,24 @@
+from enum import Enum
 from typing import Optional
 
 from fastapi import HTTPException
-from sqlmodel import select, or_
+from sqlmodel import delete, exists, select, or_
 from sqlmodel.ext.asyncio.session import AsyncSession
 
 from app.models.po.transaction_user_item_po import TransactionUserItem
+from app.utils.db_connection import release_connection, pin_primary, read_from_replica
+from app.utils.pagination import apply_keyset
 
 # Transaction-User-Item: Manages relationships between transactions, users, and items
 
 
+class TransactionRole(str, Enum):
+    INITIATOR = "initiator"
+    RECEIVER = "receiver"
+    NONE = "none"
+
+
+@release_connection
 async def create_transaction_user_item_relation(
     session: AsyncSession,
     transaction_id: str,
@@ -27,10 +37,13 @@ async def create_transaction_user_item_relation(
     )
     session.add(relation)
     await session.commit()
+    pin_primary(initiator_user_id)
+    pin_primary(receiver_user_id)
     await session.refresh(relation)
     return relation
 
 
+@release_connection
 async def get_transaction_relation(
     session: AsyncSession,
     transaction_id: str,
@@ -46,21 +59,50 @@ async def get_transaction_relation(
     return relation
 
 
+@release_connection
+async def get_transaction_relation_with_role(
+    session: AsyncSession,
+    transaction_id: str,
+    user_id: str,
+) -> tuple[TransactionUserItem, TransactionRole]:
+    """Get transaction relation by transaction_id and the role user plays in it, in one query."""
+    relation = await get_transaction_relation(session, transaction_id)
+    if relation.initiator_user_id == user_id:
+        role = TransactionRole.INITIATOR
+    elif relation.receiver_user_id == user_id:
+        role = TransactionRole.RECEIVER
+    else:
+        role = TransactionRole.NONE
+    return relation, role
+
+
+@release_connection
+@read_from_replica
 async def get_user_transactions(
     session: AsyncSession,
     user_id: str,
+    requested_item_id: Optional[str] = None,
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None,
+    offset: int = 0,
 ) -> list[TransactionUserItem]:
-    """Get all transactions where user is either initiator or receiver."""
+    """Get transactions where user is either initiator or receiver, newest first, after the cursor."""
     statement = select(TransactionUserItem).where(
         or_(
             TransactionUserItem.initiator_user_id == user_id,
             TransactionUserItem.receiver_user_id == user_id
         )
     )
+    if requested_item_id:
+        statement = statement.where(TransactionUserItem.requested_item_id == requested_item_id)
+    statement = apply_keyset(statement, TransactionUserItem, None, cursor).offset(offset)
+    if limit is not None:
+        statement = statement.limit(limit)
     result = await session.exec(statement)
     return result.all()
 
 
+@release_connection
 async def get_transactions_by_item(
     session: AsyncSession,
     item_id: str,
@@ -76,52 +118,52 @@ async def get_transactions_by_item(
     return result.all()
 
 
+@release_connection
 async def verify_transaction_participant(
     session: AsyncSession,
     transaction_id: str,
     user_id: str,
 ) -> bool:
     """Check if user is a participant (initiator or receiver) in the transaction."""
-    statement = select(TransactionUserItem).where(
+    statement = select(exists().where(
         TransactionUserItem.transaction_id == transaction_id,
         or_(
             TransactionUserItem.initiator_user_id == user_id,
             TransactionUserItem.receiver_user_id == user_id
         )
-    )
+    ))
     result = await session.exec(statement)
-    relation = result.first()
-    return relation is not None
+    return bool(result.one())
 
 
+@release_connection
 async def verify_transaction_initiator(
     session: AsyncSession,
     transaction_id: str,
     user_id: str,
 ) -> bool:
     """Check if user is the initiator of the transaction."""
-    statement = select(TransactionUserItem).where(
+    statement = select(exists().where(
         TransactionUserItem.transaction_id == transaction_id,
         TransactionUserItem.initiator_user_id == user_id
-    )
+    ))
     result = await session.exec(statement)
-    relation = result.first()
-    return relation is not None
+    return bool(result.one())
 
 
+@release_connection
 async def verify_transaction_receiver(
     session: AsyncSession,
     transaction_id: str,
     user_id: str,
 ) -> bool:
     """Check if user is the receiver of the transaction."""
-    statement = select(TransactionUserItem).where(
+    statement = select(exists().where(
         TransactionUserItem.transaction_id == transaction_id,
         TransactionUserItem.receiver_user_id == user_id
-    )
+    ))
     result = await session.exec(statement)
-    relation = result.first()
-    return relation is not None
+    return bool(result.one())
 
 
 async def delete_transaction_relation(
@@ -129,13 +171,10 @@ async def delete_transaction_relation(
     transaction_id: str,
 ) -> None:
     """Delete transaction relation by transaction_id."""
-    statement = select(TransactionUserItem).where(
+    statement = delete(TransactionUserItem).where(
         TransactionUserItem.transaction_id == transaction_id
     )
     result = await session.exec(statement)
-    relation = result.first()
-    if not relation:
+    if result.rowcount == 0:
         raise HTTPException(status_code=404, detail="Transaction relation not found")
-    
-    await session.delete(relation)
     await session.commit()
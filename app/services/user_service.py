@@ -0,0 +1,64 @@
+from uuid import UUID
+import logging
+import os
+
+from app.client.user.user_address_api_client.api.default import get_user_users_user_id_get
+from app.client.user.user_address_api_client.models import HTTPValidationError
+from app.client.user.user_address_api_client.types import UNSET
+from app.utils.cache import AsyncTTLCache
+from app.utils.singleflight import single_flight
+
+
+log = logging.getLogger(__name__)
+
+# Public profiles (id, username, avatar_url) rarely change, so they are cached in-process
+public_user_cache = AsyncTTLCache(
+    name="public_user",
+    maxsize=int(os.getenv("USER_CACHE_MAX_ENTRIES", "10000")),
+    ttl=float(os.getenv("USER_CACHE_TTL", "300")),
+    stale_ttl=float(os.getenv("USER_CACHE_STALE_TTL", "600")),
+)
+
+fetch_user = single_flight("get_user", get_user_users_user_id_get.asyncio)
+
+
+async def get_public_user(
+        user_id: UUID,
+        client,
+) -> dict | None:
+    """
+    Get the public profile of a user, served from cache when possible
+    Args:
+        user_id:    id of the user
+        client:     client for user
+
+    Returns:        dict with id, username and avatar_url, None if the user doesn't exist
+                    or the user service rejected the id
+    """
+    async def _load() -> dict | None:
+        user_response = await fetch_user(
+            user_id=user_id,
+            client=client
+        )
+        # Treated like a missing user, so GET /users/{user_id} answers 404 as before
+        if isinstance(user_response, HTTPValidationError):
+            log.warning(
+                "Downstream 'user service' validation failed for user %s. Response: %s",
+                user_id,
+                user_response.to_dict()
+            )
+            return None
+        if user_response is None:
+            return None
+        return {
+            "id": str(user_response.id) if user_response.id is not UNSET else str(user_id),
+            "username": user_response.username,
+            "avatar_url": user_response.avatar_url if user_response.avatar_url is not UNSET else None,
+        }
+
+    return await public_user_cache.get_or_load(str(user_id), _load)
+
+
+def invalidate_public_user(user_id) -> None:
+    """Drop the cached public profile of a user after it changed"""
+    public_user_cache.invalidate(str(user_id))
@@ -1,16 +1,60 @@
+import hashlib
 import os
+import time
+from collections import OrderedDict
 
 from fastapi import HTTPException
 from jose import jwt
 
 
+# Clients resend the same token on every request, a verified token is remembered until it expires
+JWT_CACHE_MAX_ENTRIES = int(os.getenv("JWT_CACHE_MAX_ENTRIES", "10000"))
+
+_jwt_secret: str | None = None
+# token digest -> (user_id, exp)
+_verified_tokens: OrderedDict[bytes, tuple[str, float | None]] = OrderedDict()
+
+
+def load_jwt_secret() -> None:
+    """Read JWT_SECRET once, called at startup"""
+    global _jwt_secret
+    _jwt_secret = os.getenv("JWT_SECRET")
+    _verified_tokens.clear()
+
+
+def _digest(token: str) -> bytes:
+    return hashlib.sha256(token.encode("utf-8")).digest()
+
+
+def _expired(exp: float | None, now: float) -> bool:
+    return exp is not None and now >= exp
+
+
 def get_user_id_from_token(token: str) -> str:
     if not token:
         raise HTTPException(status_code=401)
 
+    digest = _digest(token)
+    now = time.time()
+    cached = _verified_tokens.get(digest)
+    if cached is not None:
+        user_id, exp = cached
+        if not _expired(exp, now):
+            _verified_tokens.move_to_end(digest)
+            return user_id
+        del _verified_tokens[digest]
+
+    if _jwt_secret is None:
+        load_jwt_secret()
+
     try:
-        payload = jwt.decode(token, os.environ["JWT_SECRET"], algorithms=["HS256"])
+        payload = jwt.decode(token, _jwt_secret, algorithms=["HS256"])
         user_id = payload.get("sub")
-        return user_id
     except jwt.JWTError:
-        raise HTTPException(status_code=403)
\ No newline at end of file
+        raise HTTPException(status_code=403)
+
+    exp = payload.get("exp")
+    _verified_tokens[digest] = (user_id, float(exp) if exp is not None else None)
+    while len(_verified_tokens) > JWT_CACHE_MAX_ENTRIES:
+        _verified_tokens.popitem(last=False)
+    return user_id
@@ -0,0 +1,116 @@
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Hashable
+
+
+log = logging.getLogger(__name__)
+
+
+class AsyncTTLCache:
+    """
+    In-process LRU cache whose entries expire after `ttl` seconds.
+
+    - Expired entries are still served for `stale_ttl` more seconds while a
+      single background task refreshes them (stale-while-revalidate).
+    - Concurrent misses for the same key share one loader call (single-flight).
+    - Invalidation detaches any load in flight for the key, and only the
+      load still registered for a key writes its result back, so a load
+      that started before an invalidation never does.
+    - A loader returning None is not cached.
+    """
+
+    def __init__(self, name: str, maxsize: int, ttl: float, stale_ttl: float = 0.0):
+        self.name = name
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self._entries: OrderedDict[Hashable, tuple[Any, float]] = OrderedDict()
+        self._inflight: dict[Hashable, asyncio.Task] = {}
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "size": len(self._entries),
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+        }
+
+    def get(self, key: Hashable) -> Any | None:
+        """Get a fresh value without loading, or None"""
+        entry = self._entries.get(key)
+        if entry is None or entry[1] < time.monotonic():
+            return None
+        self._entries.move_to_end(key)
+        return entry[0]
+
+    def set(self, key: Hashable, value: Any) -> None:
+        if value is None:
+            return
+        self._entries[key] = (value, time.monotonic() + self.ttl)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, key: Hashable) -> None:
+        self._entries.pop(key, None)
+        # Later callers must not join a load that started before the invalidation,
+        # and that load must not write its result back
+        self._inflight.pop(key, None)
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._inflight.clear()
+
+    async def get_or_load(self, key: Hashable, loader: Callable[[], Awaitable[Any]]) -> Any | None:
+        entry = self._entries.get(key)
+        if entry is not None:
+            value, expires_at = entry
+            now = time.monotonic()
+            if now < expires_at:
+                self.hits += 1
+                self._entries.move_to_end(key)
+                return value
+            if now < expires_at + self.stale_ttl:
+                self.stale_hits += 1
+                self._entries.move_to_end(key)
+                self._refresh_in_background(key, loader)
+                return value
+
+        self.misses += 1
+        return await self._load(key, loader)
+
+    async def _load(self, key: Hashable, loader: Callable[[], Awaitable[Any]]) -> Any | None:
+        # Shielded so a cancelled caller does not cancel the load shared with others
+        return await asyncio.shield(self._start_load(key, loader))
+
+    def _start_load(self, key: Hashable, loader: Callable[[], Awaitable[Any]]) -> asyncio.Task:
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.create_task(self._run_loader(key, loader))
+            task.add_done_callback(self._log_failure)
+            self._inflight[key] = task
+        return task
+
+    async def _run_loader(self, key: Hashable, loader: Callable[[], Awaitable[Any]]) -> Any | None:
+        current = False
+        try:
+            value = await loader()
+        finally:
+            current = self._inflight.get(key) is asyncio.current_task()
+            if current:
+                del self._inflight[key]
+        if current:
+            self.set(key, value)
+        return value
+
+    def _refresh_in_background(self, key: Hashable, loader: Callable[[], Awaitable[Any]]) -> None:
+        self._start_load(key, loader)
+
+    def _log_failure(self, task: asyncio.Task) -> None:
+        if not task.cancelled() and task.exception() is not None:
+            log.warning("Loading %s cache entry failed: %s", self.name, task.exception())
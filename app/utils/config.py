@@ -1,5 +1,8 @@
 import os
+from typing import Any
 
+import httpx
+from attrs import evolve
 from dotenv import load_dotenv
 
 from app.client.item.item_api_client.client import Client as ItemClient
@@ -13,24 +16,98 @@ _item_client: ItemClient | None = None
 _transaction_client: TransactionClient | None = None
 
 
+def _env_int(name: str, default: int) -> int:
+    value = os.environ.get(name)
+    return int(value) if value else default
+
+
+def _env_float(name: str, default: float) -> float:
+    value = os.environ.get(name)
+    return float(value) if value else default
+
+
+def _env_bool(name: str, default: bool) -> bool:
+    value = os.environ.get(name)
+    if not value:
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+
+def _build_async_pool(base_url: str | None) -> httpx.AsyncClient:
+    """Build one keep-alive connection pool for a downstream service"""
+    limits = httpx.Limits(
+        max_connections=_env_int("HTTP_POOL_MAX_CONNECTIONS", 100),
+        max_keepalive_connections=_env_int("HTTP_POOL_MAX_KEEPALIVE", 20),
+        keepalive_expiry=_env_float("HTTP_POOL_KEEPALIVE_EXPIRY", 30.0),
+    )
+    return httpx.AsyncClient(
+        base_url=base_url or "",
+        limits=limits,
+        timeout=httpx.Timeout(_env_float("HTTP_TIMEOUT", 10.0)),
+        http2=_env_bool("HTTP2_ENABLED", False),
+    )
+
+
 def init_env():
     load_dotenv()
 
-    global _user_client, _item_client, _transaction_client
+    global _user_client, _item_client, _transaction_client, _messaging_client
 
     _user_client = UserClient(base_url=os.environ.get("USER_SERVICE_URL"))
     _item_client = ItemClient(base_url=os.environ.get("ITEM_SERVICE_URL"))
     _transaction_client = TransactionClient(base_url=os.environ.get("TRANSACTION_SERVICE_URL"))
     _messaging_client = MessagingClient(base_url=os.environ.get("MESSAGING_SERVICE_URL"))
 
+    for client, url_var in (
+        (_user_client, "USER_SERVICE_URL"),
+        (_item_client, "ITEM_SERVICE_URL"),
+        (_transaction_client, "TRANSACTION_SERVICE_URL"),
+        (_messaging_client, "MESSAGING_SERVICE_URL"),
+    ):
+        client.set_async_httpx_client(_build_async_pool(os.environ.get(url_var)))
+
+
+async def close_http_clients():
+    """Close the connection pools of all downstream clients"""
+    global _user_client, _item_client, _transaction_client, _messaging_client
+
+    for client in (_user_client, _item_client, _transaction_client, _messaging_client):
+        if client is not None:
+            await client.get_async_httpx_client().aclose()
+
+    _user_client = None
+    _item_client = None
+    _transaction_client = None
+    _messaging_client = None
+
+
+class _HeaderOverlay:
+    """Adds per-request headers on top of a shared httpx.AsyncClient"""
+
+    def __init__(self, async_client: httpx.AsyncClient, headers: dict[str, str]):
+        self._async_client = async_client
+        self._headers = headers
+
+    async def request(self, method: str, url: str, *, headers: dict[str, Any] | None = None, **kwargs):
+        return await self._async_client.request(
+            method, url, headers={**self._headers, **(headers or {})}, **kwargs
+        )
+
+
+def with_request_headers(client, headers: dict[str, str]):
+    """
+    Get a client that sends additional headers on its requests while reusing
+    the connection pool of the given client.
+    Unlike Client.with_headers, this neither opens a new pool nor mutates the
+    headers of the shared one.
+    """
+    overlay = _HeaderOverlay(client.get_async_httpx_client(), headers)
+    return evolve(client).set_async_httpx_client(overlay)
 
 
 def get_messaging_client() -> MessagingClient:
-    global _messaging_client
     if _messaging_client is None:
-        _messaging_client = MessagingClient(
-            base_url=os.environ.get("MESSAGING_SERVICE_URL")
-        )
+        init_env()
     return _messaging_client
 
 
@@ -53,4 +130,4 @@ def get_item_client() -> ItemClient:
 def get_transaction_client() -> TransactionClient:
     if _transaction_client is None:
         init_env()
-    return _transaction_client
\ No newline at end of file
+    return _transaction_client
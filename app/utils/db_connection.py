@@ -1,40 +1,291 @@
+import functools
+import inspect as pyinspect
+import logging
 import os
+import time
+from collections import OrderedDict
 from typing import Annotated
 
-from fastapi import Depends
+from fastapi import Depends, Request
+from sqlalchemy import Index, exc, insert, inspect
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncEngine
-from sqlmodel import SQLModel
+from sqlalchemy.sql.dml import UpdateBase
+from sqlmodel import SQLModel, Session
 from sqlmodel.ext.asyncio.session import AsyncSession
 
+log = logging.getLogger(__name__)
+
 engine: AsyncEngine | None = None
+read_engine: AsyncEngine | None = None
+
+# After a user writes, their reads stay on the primary until the replica has caught up
+READ_YOUR_WRITES_WINDOW = float(os.getenv("DB_READ_YOUR_WRITES_WINDOW", "5"))
+_primary_pins: OrderedDict[str, float] = OrderedDict()
+
+
+def _env_bool(name: str, default: bool) -> bool:
+    value = os.getenv(name)
+    if not value:
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+
+class PoolMetrics:
+    """Counters for connection checkouts from the engine pool"""
+
+    def __init__(self):
+        self.checkouts = 0
+        self.timeouts = 0
+        self.total_wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+
+    def record_wait(self, seconds: float) -> None:
+        self.checkouts += 1
+        self.total_wait_seconds += seconds
+        self.max_wait_seconds = max(self.max_wait_seconds, seconds)
+
+
+pool_metrics = PoolMetrics()
+
+
+class _MeteredQueuePool(AsyncAdaptedQueuePool):
+    """Queue pool that records how long each checkout waited for a connection"""
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            pool_metrics.timeouts += 1
+            raise
+        finally:
+            pool_metrics.record_wait(time.perf_counter() - start)
+
+
+def get_database_url() -> str:
+    return os.getenv("DATABASE_URL") or (
+        f"mysql+asyncmy://{os.getenv('MYSQL_USER')}:{os.getenv('MYSQL_PASSWORD')}"
+        f"@{os.getenv('MYSQL_HOST')}/{os.getenv('MYSQL_DATABASE')}"
+    )
+
+
+def _create_engine(db_url: str) -> AsyncEngine:
+    """Create an engine configured from DB_* environment variables"""
+    connect_args = {}
+    if db_url.startswith("mysql+asyncmy"):
+        connect_args["connect_timeout"] = int(os.getenv("DB_CONNECT_TIMEOUT", "10"))
+        connect_args["charset"] = os.getenv("DB_CHARSET", "utf8mb4")
+
+    return create_async_engine(
+        db_url,
+        echo=_env_bool("DB_ECHO", False),
+        poolclass=_MeteredQueuePool,
+        pool_size=int(os.getenv("DB_POOL_SIZE", "5")),
+        max_overflow=int(os.getenv("DB_MAX_OVERFLOW", "10")),
+        pool_timeout=float(os.getenv("DB_POOL_TIMEOUT", "30")),
+        pool_recycle=int(os.getenv("DB_POOL_RECYCLE", "1800")),
+        pool_pre_ping=_env_bool("DB_POOL_PRE_PING", True),
+        connect_args=connect_args,
+    )
+
+
+def get_read_database_url() -> str | None:
+    """URL of the read replica, None when reads should go to the primary"""
+    if os.getenv("DATABASE_READ_URL"):
+        return os.getenv("DATABASE_READ_URL")
+    if os.getenv("MYSQL_READ_HOST"):
+        return (
+            f"mysql+asyncmy://{os.getenv('MYSQL_USER')}:{os.getenv('MYSQL_PASSWORD')}"
+            f"@{os.getenv('MYSQL_READ_HOST')}/{os.getenv('MYSQL_DATABASE')}"
+        )
+    return None
 
 
 def get_engine() -> AsyncEngine:
     """Get or create the database engine"""
     global engine
     if not engine:
-        db_url = f"mysql+asyncmy://{os.getenv('MYSQL_USER')}:{os.getenv('MYSQL_PASSWORD')}@{os.getenv('MYSQL_HOST')}/{os.getenv('MYSQL_DATABASE')}"
-        engine = create_async_engine(db_url, echo=True)
+        engine = _create_engine(get_database_url())
     return engine
 
 
-async def get_session() -> AsyncSession:
-    """Dependency to get database session"""
-    engine = get_engine()
-    async with AsyncSession(engine) as session:
+def get_read_engine() -> AsyncEngine:
+    """Get or create the read replica engine, the primary engine if no replica is configured"""
+    global read_engine
+    read_url = get_read_database_url()
+    if not read_url:
+        return get_engine()
+    if not read_engine:
+        read_engine = _create_engine(read_url)
+    return read_engine
+
+
+def pin_primary(user_id) -> None:
+    """Route the reads of a user to the primary for READ_YOUR_WRITES_WINDOW seconds"""
+    if not user_id:
+        return
+    now = time.monotonic()
+    key = str(user_id)
+    _primary_pins.pop(key, None)
+    _primary_pins[key] = now + READ_YOUR_WRITES_WINDOW
+    # Pins share one window, so the oldest ones expire first
+    while _primary_pins and next(iter(_primary_pins.values())) < now:
+        _primary_pins.popitem(last=False)
+
+
+def is_pinned_primary(user_id) -> bool:
+    if not user_id:
+        return False
+    expires_at = _primary_pins.get(str(user_id))
+    return expires_at is not None and expires_at > time.monotonic()
+
+
+class RoutingSession(Session):
+    """
+    Sends statements to the primary, except the lookups run through read_from_replica.
+    Writes pin the requesting user to the primary.
+    """
+
+    def get_bind(self, mapper=None, clause=None, **kw):
+        if self._flushing or isinstance(clause, UpdateBase):
+            pin_primary(self.info.get("user_id"))
+            return get_engine().sync_engine
+        if self.info.get("replica"):
+            return get_read_engine().sync_engine
+        return get_engine().sync_engine
+
+
+def get_pool_metrics() -> dict:
+    """Current pool occupancy and checkout wait statistics"""
+    metrics = {
+        "checkouts": pool_metrics.checkouts,
+        "timeouts": pool_metrics.timeouts,
+        "total_wait_seconds": round(pool_metrics.total_wait_seconds, 6),
+        "max_wait_seconds": round(pool_metrics.max_wait_seconds, 6),
+        "avg_wait_seconds": round(pool_metrics.total_wait_seconds / pool_metrics.checkouts, 6)
+        if pool_metrics.checkouts else 0.0,
+    }
+    if engine is not None:
+        metrics.update(_pool_occupancy(engine))
+    if read_engine is not None:
+        metrics["replica"] = _pool_occupancy(read_engine)
+    return metrics
+
+
+def _pool_occupancy(async_engine: AsyncEngine) -> dict:
+    pool = async_engine.sync_engine.pool
+    return {
+        "pool_size": pool.size(),
+        "checked_out": pool.checkedout(),
+        "checked_in": pool.checkedin(),
+        "overflow": pool.overflow(),
+    }
+
+
+def new_session() -> AsyncSession:
+    """Session routed between primary and replica, also for work outside a request"""
+    return AsyncSession(sync_session_class=RoutingSession)
+
+
+async def get_session(request: Request) -> AsyncSession:
+    """
+    Dependency to get database session.
+    The session checks out a connection only when it first executes a statement,
+    and repository calls decorated with release_connection give it back right away.
+    """
+    async with new_session() as session:
+        session.info["user_id"] = getattr(request.state, "user_id", None)
         yield session
 
 
+def release_connection(func):
+    """
+    Return the session's connection to the pool as soon as a repository call finishes,
+    so it isn't held while the request awaits downstream services.
+    """
+    @functools.wraps(func)
+    async def wrapper(session: AsyncSession, *args, **kwargs):
+        result = await func(session, *args, **kwargs)
+        if session.in_transaction() and not (session.new or session.dirty or session.deleted):
+            # Closing keeps the loaded objects readable (detached) and the session reusable
+            await session.close()
+        return result
+
+    return wrapper
+
+
+def read_from_replica(func):
+    """
+    Run a pure lookup on the read replica.
+    It stays on the primary inside an open transaction, or when the requesting user
+    or the `user_id` argument was pinned by a recent write.
+    """
+    signature = pyinspect.signature(func)
+
+    @functools.wraps(func)
+    async def wrapper(session: AsyncSession, *args, **kwargs):
+        user_id = signature.bind(session, *args, **kwargs).arguments.get("user_id")
+        if (
+            session.in_transaction()
+            or is_pinned_primary(session.info.get("user_id"))
+            or is_pinned_primary(user_id)
+        ):
+            return await func(session, *args, **kwargs)
+        session.info["replica"] = True
+        try:
+            return await func(session, *args, **kwargs)
+        finally:
+            session.info["replica"] = False
+
+    return wrapper
+
+
 async def create_db_and_tables():
-    """Create all database tables defined in SQLModel"""
+    """
+    Create all database tables defined in SQLModel.
+    create_all skips tables that already exist, indexes declared on them later
+    are added by `python -m app.utils.index_migration`.
+    """
     engine = get_engine()
     async with engine.begin() as conn:
         await conn.run_sync(SQLModel.metadata.create_all)
+        missing = await conn.run_sync(missing_indexes)
+    if missing:
+        log.warning(
+            "Indexes missing, run `python -m app.utils.index_migration`: %s",
+            ", ".join(index.name for index in missing),
+        )
+
+
+def missing_indexes(conn) -> list[Index]:
+    """Declared indexes that do not exist in the database yet"""
+    inspector = inspect(conn)
+    missing = []
+    for table in SQLModel.metadata.sorted_tables:
+        existing = {index["name"] for index in inspector.get_indexes(table.name)}
+        missing.extend(index for index in table.indexes if index.name not in existing)
+    return missing
+
+
+async def insert_ignore(session: AsyncSession, row: SQLModel) -> bool:
+    """Insert a row unless it violates a unique index, return whether it was inserted"""
+    statement = (
+        insert(type(row))
+        .values(**row.model_dump(exclude_none=True))
+        .prefix_with("IGNORE", dialect="mysql")
+        .prefix_with("OR IGNORE", dialect="sqlite")
+    )
+    result = await session.execute(statement)
+    return result.rowcount > 0
 
 
 async def close_db_connection():
     """Close database connection and dispose engine"""
-    global engine
+    global engine, read_engine
+    if read_engine:
+        await read_engine.dispose()
+        read_engine = None
     if engine:
         await engine.dispose()
         engine = None
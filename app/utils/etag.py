@@ -0,0 +1,36 @@
+import hashlib
+import json
+from typing import Any
+
+from fastapi import Request, Response, status
+
+
+def compute_etag(content: Any) -> str:
+    """Strong validator from a hash of JSON-serializable content"""
+    payload = json.dumps(content, sort_keys=True, separators=(",", ":"), default=str)
+    return f'"{hashlib.sha256(payload.encode("utf-8")).hexdigest()[:32]}"'
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """If-None-Match uses the weak comparison, so W/ prefixes are ignored"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    return any(tag.strip().removeprefix("W/") == etag.removeprefix("W/") for tag in if_none_match.split(","))
+
+
+def conditional_get(request: Request, response: Response, etag: str) -> Response | None:
+    """
+    Set the ETag of a GET response
+    Args:
+        request:    incoming request, checked for If-None-Match
+        response:   response of the endpoint
+        etag:       validator of the representation
+
+    Returns:        a 304 to return instead when the client already has this version, None otherwise
+    """
+    response.headers["ETag"] = etag
+    if etag_matches(request.headers.get("If-None-Match"), etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+    return None
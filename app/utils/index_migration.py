@@ -0,0 +1,69 @@
+"""
+Add the indexes declared on tables that already existed when they were introduced.
+
+    python -m app.utils.index_migration [--dry-run]
+
+Before a unique index is added, rows duplicating its columns are deleted, keeping
+the oldest one, and every deleted row is logged. Running it again, or from two
+hosts at once, does nothing once the indexes exist.
+"""
+import argparse
+import asyncio
+import logging
+
+from sqlalchemy import Index, exc, func, inspect, select
+
+from app.utils.db_connection import close_db_connection, get_engine, missing_indexes
+
+log = logging.getLogger(__name__)
+
+
+def _duplicate_rows(conn, index: Index) -> list:
+    """Rows that would violate a unique index, all but the oldest of each group"""
+    table = index.table
+    keep = select(func.min(table.c.id)).group_by(*index.columns)
+    statement = select(table.c.id, *index.columns).where(table.c.id.not_in(keep)).order_by(table.c.id)
+    return conn.execute(statement).all()
+
+
+def _index_exists(conn, index: Index) -> bool:
+    return any(existing["name"] == index.name for existing in inspect(conn).get_indexes(index.table.name))
+
+
+def migrate(conn, dry_run: bool = False) -> None:
+    for index in missing_indexes(conn):
+        table = index.table
+        if index.unique:
+            duplicates = _duplicate_rows(conn, index)
+            action = "Would delete" if dry_run else "Deleting"
+            for row in duplicates:
+                log.warning("%s duplicate %s row: %s", action, table.name, dict(row._mapping))
+            if duplicates and not dry_run:
+                conn.execute(table.delete().where(table.c.id.in_([row.id for row in duplicates])))
+        if dry_run:
+            log.info("Would create index %s on %s", index.name, table.name)
+            continue
+        try:
+            index.create(conn)
+        except (exc.OperationalError, exc.ProgrammingError):
+            # Another host running the migration created it first
+            if not _index_exists(conn, index):
+                raise
+            log.info("Index %s on %s already exists", index.name, table.name)
+            continue
+        log.info("Created index %s on %s", index.name, table.name)
+
+
+async def main(dry_run: bool) -> None:
+    try:
+        async with get_engine().begin() as conn:
+            await conn.run_sync(migrate, dry_run)
+    finally:
+        await close_db_connection()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+    parser = argparse.ArgumentParser(description="Add missing indexes, removing rows that duplicate unique ones")
+    parser.add_argument("--dry-run", action="store_true", help="only log what would be deleted and created")
+    asyncio.run(main(parser.parse_args().dry_run))
@@ -0,0 +1,50 @@
+import base64
+import json
+from datetime import datetime
+from typing import Optional
+
+from fastapi import HTTPException
+from sqlmodel import and_, or_
+
+
+def encode_cursor(created_at: datetime, row_id: int) -> str:
+    """Encode the (created_at, id) position of a row as an opaque cursor"""
+    raw = json.dumps([created_at.isoformat(), row_id]).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, int]:
+    try:
+        created_at, row_id = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+        return datetime.fromisoformat(created_at), int(row_id)
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def apply_keyset(statement, model, limit: Optional[int], cursor: Optional[str]):
+    """
+    Order a select newest first by (created_at, id) and continue after the cursor.
+    One extra row is fetched so keyset_page can tell whether a next page exists.
+    """
+    if cursor:
+        created_at, row_id = decode_cursor(cursor)
+        statement = statement.where(
+            or_(
+                model.created_at < created_at,
+                and_(model.created_at == created_at, model.id < row_id),
+            )
+        )
+    statement = statement.order_by(model.created_at.desc(), model.id.desc())
+    if limit is not None:
+        statement = statement.limit(max(limit, 0) + 1)
+    return statement
+
+
+def keyset_page(rows: list, limit: Optional[int]) -> tuple[list, Optional[str]]:
+    """Split the rows of an apply_keyset query into the page and the next cursor"""
+    if limit is not None and limit <= 0:
+        return [], None
+    if limit is None or len(rows) <= limit:
+        return list(rows), None
+    page = list(rows[:limit])
+    return page, encode_cursor(page[-1].created_at, page[-1].id)
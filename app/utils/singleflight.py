@@ -0,0 +1,85 @@
+import asyncio
+import functools
+from typing import Any, Awaitable, Callable, Hashable
+
+
+class SingleFlight:
+    """
+    Collapses concurrent calls with the same key into one.
+    The first caller starts the call, later callers await the same task and
+    receive the same result (or exception). Nothing is kept once it finishes.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._inflight: dict[Hashable, asyncio.Task] = {}
+        self.calls = 0
+        self.collapsed = 0
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "calls": self.calls,
+            "collapsed": self.collapsed,
+            "inflight": len(self._inflight),
+        }
+
+    async def do(self, key: Hashable, call: Callable[[], Awaitable[Any]]) -> Any:
+        self.calls += 1
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.create_task(self._run(key, call))
+            task.add_done_callback(_retrieve_exception)
+            self._inflight[key] = task
+        else:
+            self.collapsed += 1
+        # Shielded so a cancelled caller does not cancel the call shared with others
+        return await asyncio.shield(task)
+
+    async def _run(self, key: Hashable, call: Callable[[], Awaitable[Any]]) -> Any:
+        try:
+            return await call()
+        finally:
+            del self._inflight[key]
+
+
+def _retrieve_exception(task: asyncio.Task) -> None:
+    # Every caller may have been cancelled, the error was already raised to any that waited
+    if not task.cancelled():
+        task.exception()
+
+
+_groups: dict[str, SingleFlight] = {}
+
+
+def _freeze(value) -> Hashable:
+    if isinstance(value, (list, tuple, set)):
+        return tuple(_freeze(v) for v in value)
+    if isinstance(value, dict):
+        return tuple(sorted((k, _freeze(v)) for k, v in value.items()))
+    return value
+
+
+def single_flight(name: str, fetch: Callable[..., Awaitable[Any]]) -> Callable[..., Awaitable[Any]]:
+    """
+    Opt a generated client `asyncio` function into request coalescing.
+    Calls are identical when they use the same client object and the same
+    keyword arguments, so clients carrying per-request headers are never shared.
+    Wrapping the same name twice shares one group.
+    Args:
+        name:   name of the endpoint in the metrics
+        fetch:  generated `asyncio` function, called with keyword arguments only
+
+    Returns:    coroutine function with the same signature
+    """
+    group = _groups.setdefault(name, SingleFlight(name))
+
+    @functools.wraps(fetch)
+    async def wrapper(*, client, **kwargs):
+        key = (id(client), _freeze(kwargs))
+        return await group.do(key, lambda: fetch(client=client, **kwargs))
+
+    return wrapper
+
+
+def get_single_flight_stats() -> dict[str, dict[str, int]]:
+    return {name: group.stats() for name, group in _groups.items()}
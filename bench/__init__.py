@@ -0,0 +1,10 @@
+"""
+Benchmarks and load tests, run from the repository root, e.g. `python -m bench.upload_memory`.
+Importing `app` needs a few settings, offline defaults are filled in for the ones that are missing.
+"""
+import os
+
+os.environ.setdefault("USER_SERVICE_URL", "http://user.local")
+os.environ.setdefault("JWT_SECRET", "bench-secret")
+os.environ.setdefault("IMAGE_STORAGE_BACKEND", "local")
+os.environ.setdefault("IMAGE_LOCAL_DIR", os.path.join(os.path.dirname(__file__), ".images"))
@@ -0,0 +1,76 @@
+"""
+Wall time of resolving a user's addresses, sequentially as GET /me/user used to
+and with get_addresses, against a user service stub that injects latency.
+
+    python -m bench.address_fanout [--addresses 8] [--latency-ms 100]
+
+The cache is cleared before every run so each one reaches the stub.
+"""
+import argparse
+import asyncio
+import random
+import time
+import uuid
+
+import httpx
+
+from app.client.user.user_address_api_client.client import Client
+from app.services import address_service
+from app.services.address_service import address_cache, get_address, get_addresses
+
+
+def stub_client(latencies: dict[str, float]) -> Client:
+    async def handler(request: httpx.Request) -> httpx.Response:
+        address_id = request.url.path.rsplit("/", 1)[-1]
+        await asyncio.sleep(latencies[address_id])
+        return httpx.Response(200, json={"id": address_id, "street": "s", "city": "c", "country": "US"})
+
+    transport = httpx.MockTransport(handler)
+    return Client(base_url="http://user.bench").set_async_httpx_client(
+        httpx.AsyncClient(base_url="http://user.bench", transport=transport)
+    )
+
+
+async def sequential(address_ids, client) -> list[dict]:
+    """The loop GET /me/user ran before: one address after the other"""
+    addresses = []
+    for address_id in address_ids:
+        address = await get_address(address_id, client)
+        if address is not None:
+            addresses.append(address)
+    return addresses
+
+
+async def timed(resolve, address_ids, client) -> tuple[float, int]:
+    address_cache.clear()
+    start = time.perf_counter()
+    addresses = await resolve(address_ids, client)
+    return time.perf_counter() - start, len(addresses)
+
+
+async def run(count: int, latency: float) -> None:
+    address_ids = [uuid.uuid4() for _ in range(count)]
+    latencies = {str(a): latency * random.uniform(0.5, 1.5) for a in address_ids}
+    client = stub_client(latencies)
+    print(f"{count} addresses, latencies sum {sum(latencies.values()) * 1000:.0f}ms max {max(latencies.values()) * 1000:.0f}ms")
+
+    for name, resolve in (("sequential", sequential), ("get_addresses", get_addresses)):
+        elapsed, found = await timed(resolve, address_ids, client)
+        print(f"  {name:<14} {elapsed * 1000:7.0f}ms  {found} addresses")
+
+    # One address hangs, it is dropped after the per-address timeout instead of holding the page
+    latencies[str(address_ids[0])] = address_service.ADDRESS_FETCH_TIMEOUT * 5
+    elapsed, found = await timed(get_addresses, address_ids, client)
+    print(f"  {'one hanging':<14} {elapsed * 1000:7.0f}ms  {found} addresses (timeout {address_service.ADDRESS_FETCH_TIMEOUT}s)")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--addresses", type=int, default=8)
+    parser.add_argument("--latency-ms", type=float, default=100)
+    args = parser.parse_args()
+    asyncio.run(run(args.addresses, args.latency_ms / 1000))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""
+Latency of cheap requests while large uploads are being compressed, with the
+compression on the event loop (as compress_image used to run) and in the
+process pool.
+
+Cheap requests are 20 tasks sleeping 5ms in a loop, their latency is how late
+they wake up. Finally the pool is saturated to show the 503 backpressure.
+
+    python -m bench.compression_latency [--uploads 2] [--width 1800 --height 1400]
+"""
+import argparse
+import asyncio
+import io
+import time
+
+from fastapi import HTTPException
+from PIL import Image
+
+from app.services import image_service
+
+TICK = 0.005
+
+
+def large_png(width: int, height: int) -> bytes:
+    noise = Image.effect_noise((width, height), 60).convert("RGB")
+    gradient = Image.linear_gradient("L").resize((width, height)).convert("RGB")
+    buffer = io.BytesIO()
+    Image.blend(noise, gradient, 0.5).save(buffer, format="PNG", compress_level=1)
+    return buffer.getvalue()
+
+
+async def on_event_loop(image_data: bytes, max_size: int):
+    """What compress_image did before: all the Pillow work on the loop"""
+    return image_service._compress_image_sync(image_data, max_size)
+
+
+async def measure(compress, image_data: bytes, uploads: int, max_size: int) -> tuple[float, list[float]]:
+    lateness = []
+    stop = asyncio.Event()
+
+    async def cheap():
+        while not stop.is_set():
+            start = time.perf_counter()
+            await asyncio.sleep(TICK)
+            lateness.append(time.perf_counter() - start - TICK)
+
+    cheap_tasks = [asyncio.create_task(cheap()) for _ in range(20)]
+    await asyncio.sleep(0.2)
+    lateness.clear()
+    start = time.perf_counter()
+    await asyncio.gather(*(compress(image_data, max_size) for _ in range(uploads)))
+    elapsed = time.perf_counter() - start
+    stop.set()
+    await asyncio.gather(*cheap_tasks)
+    return elapsed, sorted(lateness)
+
+
+def percentile(values: list[float], q: float) -> float:
+    return values[max(int(len(values) * q) - 1, 0)] * 1000
+
+
+async def run(uploads: int, width: int, height: int) -> None:
+    image_data = large_png(width, height)
+    # Below the image size so every upload has to be compressed
+    max_size = len(image_data) // 3
+    print(f"{uploads} concurrent uploads of a {len(image_data) / 1e6:.1f}MB PNG, target {max_size / 1e6:.1f}MB")
+
+    image_service.IMAGE_COMPRESS_TIMEOUT = 600
+    # As the app does at startup, the forkserver imports the app while the first run goes on
+    image_service.start_compress_workers()
+    for name, compress in (("event loop (before)", on_event_loop), ("process pool", image_service.compress_image)):
+        elapsed, lateness = await measure(compress, image_data, uploads, max_size)
+        print(
+            f"  {name:<20} uploads {elapsed:5.1f}s   cheap requests n={len(lateness)}"
+            f" p50 {percentile(lateness, 0.5):7.2f}ms p99 {percentile(lateness, 0.99):7.2f}ms"
+            f" max {lateness[-1] * 1000:7.0f}ms"
+        )
+    image_service.shutdown_compress_pool()
+
+    image_service.IMAGE_COMPRESS_WORKERS = 1
+    image_service.IMAGE_COMPRESS_QUEUE_DEPTH = 1
+    results = await asyncio.gather(
+        *(image_service.compress_image(image_data, max_size) for _ in range(4)),
+        return_exceptions=True,
+    )
+    statuses = [r.status_code if isinstance(r, HTTPException) else "ok" for r in results]
+    print(f"  4 uploads into 1 worker + 1 queued: {statuses}")
+    image_service.shutdown_compress_pool()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--uploads", type=int, default=2)
+    parser.add_argument("--width", type=int, default=1800)
+    parser.add_argument("--height", type=int, default=1400)
+    args = parser.parse_args()
+    asyncio.run(run(args.uploads, args.width, args.height))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+"""
+Encode count and wall time per image of the compression solver, against the
+quality-then-scale loop compress_image used before, on a synthetic corpus of
+large PNG and JPEG images.
+
+    python -m bench.compression_solver [--scale 0.5] [--max-size-mb 5]
+
+--scale 1 builds the full size corpus (up to 6000x4000), which takes minutes.
+The old loop can restart forever on some images, it is stopped after 40 encodes.
+"""
+import argparse
+import io
+import time
+from typing import Tuple
+
+from PIL import Image, ImageFilter
+
+from app.services import image_service
+
+LEGACY_MAX_ENCODES = 40
+
+_save = Image.Image.save
+encodes = 0
+
+
+def _counting_save(self, *args, **kwargs):
+    global encodes
+    encodes += 1
+    return _save(self, *args, **kwargs)
+
+
+class LegacyGaveUp(Exception):
+    pass
+
+
+def legacy_compress(image_data: bytes, max_size: int) -> Tuple[bytes, str]:
+    """The loop compress_image ran before the solver, stopped after LEGACY_MAX_ENCODES"""
+    image = Image.open(io.BytesIO(image_data))
+    original_format = image.format or 'JPEG'
+    if image.mode in ('RGBA', 'LA', 'P'):
+        background = Image.new('RGB', image.size, (255, 255, 255))
+        if image.mode == 'P':
+            image = image.convert('RGBA')
+        background.paste(image, mask=image.split()[-1] if image.mode in ('RGBA', 'LA') else None)
+        image = background
+        output_format = 'JPEG'
+        content_type = 'image/jpeg'
+    else:
+        output_format = original_format
+        content_type = f'image/{original_format.lower()}'
+
+    quality = 85
+    scale_factor = 1.0
+    for _ in range(LEGACY_MAX_ENCODES):
+        if scale_factor < 1.0:
+            new_size = (int(image.size[0] * scale_factor), int(image.size[1] * scale_factor))
+            resized_image = image.resize(new_size, Image.Resampling.LANCZOS)
+        else:
+            resized_image = image
+        output = io.BytesIO()
+        if output_format == 'JPEG':
+            resized_image.save(output, format='JPEG', quality=quality, optimize=True)
+        elif output_format == 'PNG':
+            png_compress_level = min(9, int((100 - quality) / 10))
+            resized_image.save(output, format='PNG', compress_level=png_compress_level, optimize=True)
+        else:
+            resized_image.save(output, format=output_format, optimize=True)
+        compressed_data = output.getvalue()
+        compressed_size = len(compressed_data)
+        if compressed_size <= max_size:
+            return compressed_data, content_type
+        if quality > 30:
+            quality -= 10
+        elif scale_factor > 0.5:
+            scale_factor -= 0.1
+        else:
+            if output_format != 'JPEG':
+                output_format = 'JPEG'
+                content_type = 'image/jpeg'
+                if resized_image.mode != 'RGB':
+                    resized_image = resized_image.convert('RGB')
+            quality = max(20, quality - 5)
+            if quality <= 20 and compressed_size > max_size:
+                scale_factor = 0.5
+                quality = 30
+    raise LegacyGaveUp()
+
+
+def photo(width: int, height: int, noise: int) -> Image.Image:
+    gradient = Image.linear_gradient("L").resize((width, height))
+    grain = Image.effect_noise((width, height), noise)
+    if noise < 40:
+        return Image.merge("RGB", (gradient, grain, Image.blend(gradient, grain, 0.5))).filter(ImageFilter.SMOOTH)
+    return Image.merge("RGB", (gradient, grain, grain))
+
+
+def encoded(image: Image.Image, image_format: str, **params) -> bytes:
+    buffer = io.BytesIO()
+    _save(image, buffer, format=image_format, **params)
+    return buffer.getvalue()
+
+
+def corpus(scale: float) -> list[tuple[str, bytes]]:
+    def size(width, height):
+        return int(width * scale), int(height * scale)
+
+    images = [
+        ("jpeg q98 smooth", size(4000, 3000), lambda s: encoded(photo(*s, 20), "JPEG", quality=98)),
+        ("jpeg q98 noisy", size(4000, 3000), lambda s: encoded(photo(*s, 80), "JPEG", quality=98)),
+        ("jpeg q95 noisy", size(6000, 4000), lambda s: encoded(photo(*s, 60), "JPEG", quality=95)),
+        ("png rgb noisy", size(3000, 2000), lambda s: encoded(photo(*s, 60), "PNG", compress_level=1)),
+        ("png rgba", size(2500, 2500), lambda s: encoded(photo(*s, 50).convert("RGBA"), "PNG", compress_level=1)),
+    ]
+    return [(f"{name} {s[0]}x{s[1]}", build(s)) for name, s, build in images]
+
+
+def timed(compress, image_data: bytes, max_size: int) -> str:
+    global encodes
+    encodes = 0
+    start = time.perf_counter()
+    try:
+        output, content_type = compress(image_data, max_size)
+    except LegacyGaveUp:
+        return f"{encodes:2d} enc {time.perf_counter() - start:6.1f}s  gave up"
+    return f"{encodes:2d} enc {time.perf_counter() - start:6.1f}s -> {len(output) / 1e6:5.2f}MB {content_type}"
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--scale", type=float, default=0.5)
+    parser.add_argument("--max-size-mb", type=float, default=5)
+    args = parser.parse_args()
+    # Scaled down images get a proportionally smaller target, so they still need compressing
+    max_size = int(args.max_size_mb * 1024 * 1024 * args.scale * args.scale)
+
+    Image.Image.save = _counting_save
+    print(f"target {max_size / 1e6:.2f}MB")
+    print(f"{'image':<28} {'size':>7}  {'before (quality, then scale loop)':<44} after (solver)")
+    for name, image_data in corpus(args.scale):
+        before = timed(legacy_compress, image_data, max_size)
+        after = timed(image_service._compress_image_sync, image_data, max_size)
+        print(f"{name:<28} {len(image_data) / 1e6:5.1f}MB  {before:<44} {after}", flush=True)
+
+
+if __name__ == "__main__":
+    main()
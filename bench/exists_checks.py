@@ -0,0 +1,156 @@
+"""
+Per-check cost of the ownership and participant checks on SQLite, loading the
+full ORM row as they used to versus the EXISTS queries they run now.
+
+Through aiosqlite the thread hop per query dominates, so the same statements are
+also timed on a synchronous SQLite session, where the row transfer and ORM
+hydration that EXISTS avoids are visible.
+
+    python -m bench.exists_checks [--checks 5000] [--rows 2000]
+"""
+import argparse
+import asyncio
+import time
+
+from sqlalchemy import create_engine, exists
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlmodel import Session, SQLModel, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.models.po.address_user_po import AddressUser
+from app.models.po.item_user_po import ItemUser
+from app.models.po.transaction_user_item_po import TransactionUserItem
+from app.services.address_user_repository import verify_address_ownership
+from app.services.item_user_repository import verify_item_ownership
+from app.services.transaction_user_item_repository import verify_transaction_initiator
+from app.utils.db_connection import release_connection
+
+USERS = 7
+
+
+def select_row(model, conditions):
+    """How the checks were written before: hydrate the row and test it for None"""
+    @release_connection
+    async def check(session: AsyncSession, *args) -> bool:
+        result = await session.exec(select(model).where(*conditions(*args)))
+        return result.first() is not None
+    return check
+
+
+# (name, model, conditions, check as it is now, arguments of the i-th check)
+CHECKS = [
+    (
+        "verify_item_ownership",
+        ItemUser,
+        lambda item_id, user_id: (ItemUser.item_id == item_id, ItemUser.user_id == user_id),
+        verify_item_ownership,
+        lambda i: (f"item-{i}", f"user-{i % USERS}"),
+    ),
+    (
+        "verify_address_ownership",
+        AddressUser,
+        lambda address_id, user_id: (AddressUser.address_id == address_id, AddressUser.user_id == user_id),
+        verify_address_ownership,
+        lambda i: (f"address-{i}", f"user-{i % USERS}"),
+    ),
+    (
+        "verify_transaction_initiator",
+        TransactionUserItem,
+        lambda transaction_id, user_id: (
+            TransactionUserItem.transaction_id == transaction_id,
+            TransactionUserItem.initiator_user_id == user_id,
+        ),
+        verify_transaction_initiator,
+        lambda i: (f"transaction-{i}", f"user-{i % USERS}"),
+    ),
+]
+
+
+def seed_rows(rows: int) -> list[SQLModel]:
+    seeded = []
+    for i in range(rows):
+        user_id = f"user-{i % USERS}"
+        seeded.append(ItemUser(item_id=f"item-{i}", user_id=user_id))
+        seeded.append(AddressUser(address_id=f"address-{i}", user_id=user_id))
+        seeded.append(TransactionUserItem(
+            transaction_id=f"transaction-{i}",
+            initiator_user_id=user_id,
+            receiver_user_id="receiver",
+            requested_item_id=f"item-{i}",
+        ))
+    return seeded
+
+
+async def seed(engine, rows: int) -> None:
+    async with engine.begin() as conn:
+        await conn.run_sync(SQLModel.metadata.create_all)
+    async with AsyncSession(engine) as session:
+        session.add_all(seed_rows(rows))
+        await session.commit()
+
+
+def sync_per_check(session: Session, statement_for, args, rows: int, checks: int) -> float:
+    start = time.perf_counter()
+    for i in range(checks):
+        assert session.exec(statement_for(*args(i % rows))).first()
+    return (time.perf_counter() - start) / checks
+
+
+def run_sync(rows: int, checks: int) -> None:
+    engine = create_engine("sqlite://")
+    SQLModel.metadata.create_all(engine)
+    with Session(engine) as session:
+        session.add_all(seed_rows(rows))
+        session.commit()
+    print("  synchronous session, statement only")
+    with Session(engine) as session:
+        for name, model, conditions, _, args in CHECKS:
+            def row_statement(*a, model=model, conditions=conditions):
+                return select(model).where(*conditions(*a))
+
+            def exists_statement(*a, conditions=conditions):
+                return select(exists().where(*conditions(*a)))
+
+            sync_per_check(session, row_statement, args, rows, 100)
+            sync_per_check(session, exists_statement, args, rows, 100)
+            old = sync_per_check(session, row_statement, args, rows, checks)
+            new = sync_per_check(session, exists_statement, args, rows, checks)
+            print(f"    {name:<30} row {old * 1e6:7.1f}   exists {new * 1e6:7.1f}   {old / new:4.2f}x")
+    engine.dispose()
+
+
+async def per_check(session: AsyncSession, check, args, rows: int, checks: int) -> float:
+    start = time.perf_counter()
+    for i in range(checks):
+        assert await check(session, *args(i % rows))
+    return (time.perf_counter() - start) / checks
+
+
+async def run(rows: int, checks: int) -> None:
+    engine = create_async_engine("sqlite+aiosqlite://")
+    await seed(engine, rows)
+    print(f"{rows} rows per table, {checks} checks each, microseconds per check")
+    print("  repository functions through aiosqlite")
+    async with AsyncSession(engine) as session:
+        for name, model, conditions, after, args in CHECKS:
+            before = select_row(model, conditions)
+            # Warm up the statement caches of both variants
+            await per_check(session, before, args, rows, 100)
+            await per_check(session, after, args, rows, 100)
+            old = await per_check(session, before, args, rows, checks)
+            new = await per_check(session, after, args, rows, checks)
+            print(f"    {name:<30} row {old * 1e6:7.1f}   exists {new * 1e6:7.1f}   {old / new:4.2f}x")
+    await engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=2000)
+    parser.add_argument("--checks", type=int, default=5000)
+    args = parser.parse_args()
+    asyncio.run(run(args.rows, args.checks))
+    run_sync(args.rows, args.checks)
+
+
+if __name__ == "__main__":
+    main()
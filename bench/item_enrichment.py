@@ -0,0 +1,110 @@
+"""
+Downstream requests and wall time of enriching one item page with owners and
+addresses, per item as GET /items used to and with complete_items, against a
+user service stub that counts requests and injects latency.
+
+    python -m bench.item_enrichment [--items 100] [--owners 3] [--addresses 2] [--latency-ms 20]
+
+The user and address caches are cleared before every run so each one reaches the stub.
+"""
+import argparse
+import asyncio
+import time
+import uuid
+from collections import Counter
+from datetime import datetime
+
+import httpx
+
+from app.client.item.item_api_client.models import ItemRead as ClientItemRead
+from app.client.user.user_address_api_client.api.default import (
+    get_address_addresses_address_id_get,
+    get_user_users_user_id_get,
+)
+from app.client.user.user_address_api_client.client import Client
+from app.models.dto.item_dto import ItemRead
+from app.services.address_service import address_cache
+from app.services.item_service import complete_items
+from app.services.user_service import public_user_cache
+
+
+def stub_client(latency: float, requests: Counter) -> Client:
+    async def handler(request: httpx.Request) -> httpx.Response:
+        kind, resource_id = request.url.path.strip("/").split("/", 1)
+        requests[kind] += 1
+        await asyncio.sleep(latency)
+        if kind == "users":
+            return httpx.Response(200, json={"id": resource_id, "username": "owner", "email": "owner@example.com"})
+        return httpx.Response(200, json={"id": resource_id, "street": "s", "city": "c", "country": "US"})
+
+    transport = httpx.MockTransport(handler)
+    return Client(base_url="http://user.bench").set_async_httpx_client(
+        httpx.AsyncClient(base_url="http://user.bench", transport=transport)
+    )
+
+
+def item_page(count: int, owners: int, addresses: int) -> tuple[list[ClientItemRead], list[uuid.UUID]]:
+    owner_ids = [uuid.uuid4() for _ in range(owners)]
+    address_ids = [uuid.uuid4() for _ in range(addresses)]
+    now = datetime.now().isoformat()
+    items = [
+        ClientItemRead.from_dict({
+            "item_UUID": str(uuid.uuid4()),
+            "title": f"Item {i}",
+            "condition": "GOOD",
+            "transaction_type": "SALE",
+            "price": float(i),
+            "address_UUID": str(address_ids[i % addresses]),
+            "created_at": now,
+            "updated_at": now,
+        })
+        for i in range(count)
+    ]
+    return items, [owner_ids[i % owners] for i in range(count)]
+
+
+async def complete_item_before(item_obj, user_id: uuid.UUID, client) -> ItemRead:
+    """What each item went through before: its own address and user request"""
+    item_dict = item_obj.to_dict()
+    address = await get_address_addresses_address_id_get.asyncio(address_id=uuid.UUID(item_dict["address_UUID"]), client=client)
+    if address is not None:
+        item_dict["address"] = address.to_dict()
+    user = await get_user_users_user_id_get.asyncio(user_id=user_id, client=client)
+    if user is not None:
+        item_dict["user"] = user.to_dict()
+    return ItemRead(**item_dict)
+
+
+async def per_item(items, user_ids, client) -> list[ItemRead]:
+    return await asyncio.gather(*(complete_item_before(item, u_id, client) for item, u_id in zip(items, user_ids)))
+
+
+async def run(count: int, owners: int, addresses: int, latency: float) -> None:
+    items, user_ids = item_page(count, owners, addresses)
+    print(f"{count} items, {owners} owners, {addresses} addresses, stub latency {latency * 1000:.0f}ms")
+    print(f"  {'path':<24} {'requests':>8} {'users':>6} {'addrs':>6} {'wall':>8}")
+
+    for name, enrich in (("per item (before)", per_item), ("complete_items (after)", complete_items)):
+        public_user_cache.clear()
+        address_cache.clear()
+        requests = Counter()
+        client = stub_client(latency, requests)
+        start = time.perf_counter()
+        page = await enrich(items, user_ids, client)
+        elapsed = time.perf_counter() - start
+        assert all(item.user is not None and item.address is not None for item in page)
+        print(f"  {name:<24} {sum(requests.values()):>8} {requests['users']:>6} {requests['addresses']:>6} {elapsed * 1000:6.0f}ms")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--items", type=int, default=100)
+    parser.add_argument("--owners", type=int, default=3)
+    parser.add_argument("--addresses", type=int, default=2)
+    parser.add_argument("--latency-ms", type=float, default=20)
+    args = parser.parse_args()
+    asyncio.run(run(args.items, args.owners, args.addresses, args.latency_ms / 1000))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""
+Per-request overhead of the correlation-id and auth middlewares on GET /,
+as BaseHTTPMiddleware subclasses (how they were written before) and as the
+pure ASGI middlewares in app.main and app.middleware.auth_middleware.
+
+    python -m bench.middleware_overhead [--requests 3000] [--rounds 3]
+"""
+import argparse
+import asyncio
+import logging
+import time
+import uuid
+
+import httpx
+from fastapi import FastAPI, Request, Response
+from fastapi.responses import JSONResponse
+from starlette.middleware.base import BaseHTTPMiddleware
+
+from app.main import CorrelationIdMiddleware
+from app.middleware.auth_middleware import AuthMiddleware
+from app.resources.root_router import root_router
+from app.utils.auth import get_user_id_from_token
+
+logger = logging.getLogger("composite_api")
+
+
+class LegacyCorrelationIdMiddleware(BaseHTTPMiddleware):
+    async def dispatch(self, request: Request, call_next):
+        corr_id = request.headers.get("X-Correlation-ID", str(uuid.uuid4()))
+        request.state.correlation_id = corr_id
+        logger.info("Composite incoming %s %s (correlation_id=%s)", request.method, request.url.path, corr_id)
+        response: Response = await call_next(request)
+        response.headers["X-Correlation-ID"] = corr_id
+        logger.info(
+            "Composite outgoing %s %s status=%s (correlation_id=%s)",
+            request.method, request.url.path, response.status_code, corr_id,
+        )
+        return response
+
+
+class LegacyAuthMiddleware(BaseHTTPMiddleware):
+    def __init__(self, app, protected_prefixes=None):
+        super().__init__(app)
+        self.protected_prefixes = list(protected_prefixes)
+
+    async def dispatch(self, request: Request, call_next):
+        if request.method == "OPTIONS":
+            return await call_next(request)
+        if not any(request.url.path.startswith(prefix) for prefix in self.protected_prefixes):
+            return await call_next(request)
+        scheme, _, token = request.headers.get("Authorization", "").partition(" ")
+        if scheme.lower() != "bearer" or not token:
+            return JSONResponse(status_code=401, content={"detail": "Not authenticated"})
+        try:
+            request.state.user_id = get_user_id_from_token(token)
+        except Exception:
+            return JSONResponse(status_code=403, content={"detail": "Invalid or expired token"})
+        return await call_next(request)
+
+
+def build(correlation=None, auth=None) -> FastAPI:
+    app = FastAPI()
+    if correlation is not None:
+        app.add_middleware(correlation)
+    if auth is not None:
+        app.add_middleware(auth, protected_prefixes=("/me/",))
+    app.include_router(root_router)
+    return app
+
+
+async def per_request(app: FastAPI, requests: int) -> float:
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://composite.bench") as client:
+        for _ in range(200):
+            await client.get("/")
+        start = time.perf_counter()
+        for _ in range(requests):
+            await client.get("/")
+        return (time.perf_counter() - start) / requests
+
+
+async def run(requests: int, rounds: int) -> None:
+    # Logging is not what is measured, both variants log the same lines
+    logging.disable(logging.CRITICAL)
+    variants = (
+        ("BaseHTTPMiddleware", build(LegacyCorrelationIdMiddleware, LegacyAuthMiddleware)),
+        ("pure ASGI", build(CorrelationIdMiddleware, AuthMiddleware)),
+    )
+    print(f"GET /, {requests} sequential requests per round, microseconds per request")
+    for _ in range(rounds):
+        bare = await per_request(build(), requests)
+        row = [f"no middleware {bare * 1e6:5.0f}"]
+        for name, app in variants:
+            elapsed = await per_request(app, requests)
+            row.append(f"{name} {elapsed * 1e6:5.0f} (+{(elapsed - bare) * 1e6:.0f})")
+        print("  " + "   ".join(row))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=3000)
+    parser.add_argument("--rounds", type=int, default=3)
+    args = parser.parse_args()
+    asyncio.run(run(args.requests, args.rounds))
+
+
+if __name__ == "__main__":
+    main()
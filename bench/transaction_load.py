@@ -0,0 +1,151 @@
+"""
+Load test of GET /transactions/{id} beyond 10 concurrent requests.
+
+The endpoint runs in-process against SQLite, the transaction service is a stub
+answering after a fixed latency. For comparison, the same lookups also run the
+way the router used to, the generated .sync() call on a 10 thread pool, and
+the way it does now, awaiting the async client. The full endpoint adds routing,
+serialization and the ETag on top of that.
+
+    python -m bench.transaction_load [--latency-ms 50] [--concurrency 10 50 200]
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+_db_dir = tempfile.mkdtemp()
+os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{_db_dir}/bench.db"
+
+import httpx
+from fastapi import FastAPI, Request
+
+from app.client.transaction.transaction_api_client.api.default import get_transaction_transactions_transaction_id_get
+from app.resources.transaction_user_item_router import transaction_user_item_router
+from app.services.transaction_user_item_repository import create_transaction_user_item_relation, get_transaction_relation
+from app.utils import config
+from app.utils.db_connection import close_db_connection, create_db_and_tables, new_session
+
+USER_ID = "bench-user"
+TRANSACTIONS = 200
+
+
+def transaction_json(transaction_id: str) -> dict:
+    now = datetime.now().isoformat()
+    return {"transaction_id": transaction_id, "type": "trade", "status": "pending", "created_at": now, "updated_at": now}
+
+
+def install_stubs(latency: float) -> None:
+    async def async_handler(request: httpx.Request) -> httpx.Response:
+        await asyncio.sleep(latency)
+        return httpx.Response(200, json=transaction_json(request.url.path.rsplit("/", 1)[-1]))
+
+    def sync_handler(request: httpx.Request) -> httpx.Response:
+        time.sleep(latency)
+        return httpx.Response(200, json=transaction_json(request.url.path.rsplit("/", 1)[-1]))
+
+    client = config.get_transaction_client()
+    client.set_async_httpx_client(httpx.AsyncClient(base_url="http://transaction.bench", transport=httpx.MockTransport(async_handler)))
+    client.set_httpx_client(httpx.Client(base_url="http://transaction.bench", transport=httpx.MockTransport(sync_handler)))
+
+
+def bench_app() -> FastAPI:
+    app = FastAPI()
+
+    @app.middleware("http")
+    async def authenticate(request: Request, call_next):
+        request.state.user_id = USER_ID
+        return await call_next(request)
+
+    app.include_router(transaction_user_item_router)
+    return app
+
+
+_thread_pool = ThreadPoolExecutor(max_workers=10)
+
+
+async def thread_pool_lookup(transaction_id: str) -> None:
+    """What the router did before: .sync() on the 10 thread pool next to the DB query"""
+    loop = asyncio.get_running_loop()
+    async with new_session() as session:
+        await asyncio.gather(
+            loop.run_in_executor(
+                _thread_pool,
+                lambda: get_transaction_transactions_transaction_id_get.sync(
+                    client=config.get_transaction_client(),
+                    transaction_id=transaction_id,
+                ),
+            ),
+            get_transaction_relation(session, transaction_id),
+        )
+
+
+async def async_lookup(transaction_id: str) -> None:
+    """The same lookup as the router does it now, awaiting the shared async client"""
+    async with new_session() as session:
+        await asyncio.gather(
+            get_transaction_transactions_transaction_id_get.asyncio(
+                client=config.get_transaction_client(),
+                transaction_id=transaction_id,
+            ),
+            get_transaction_relation(session, transaction_id),
+        )
+
+
+async def burst(call, concurrency: int) -> tuple[float, float]:
+    latencies = []
+
+    async def one(i: int):
+        start = time.perf_counter()
+        await call(f"t{i % TRANSACTIONS}")
+        latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(concurrency)))
+    wall = time.perf_counter() - start
+    latencies.sort()
+    return wall, latencies[int(len(latencies) * 0.99) - 1 if len(latencies) > 1 else 0]
+
+
+async def run(latency: float, levels: list[int]) -> None:
+    await create_db_and_tables()
+    async with new_session() as session:
+        for i in range(TRANSACTIONS):
+            await create_transaction_user_item_relation(session, f"t{i}", USER_ID, "other-user", "item")
+    install_stubs(latency)
+
+    client = httpx.AsyncClient(transport=httpx.ASGITransport(app=bench_app()), base_url="http://composite.bench")
+
+    async def endpoint_lookup(transaction_id: str) -> None:
+        response = await client.get(f"/transactions/{transaction_id}")
+        response.raise_for_status()
+
+    print(f"transaction service latency {latency * 1000:.0f}ms")
+    print(f"{'concurrency':>11}  {'path':<24} {'wall':>8} {'p99':>8} {'req/s':>8}")
+    for concurrency in levels:
+        paths = (
+            ("thread pool (before)", thread_pool_lookup),
+            ("async client (after)", async_lookup),
+            ("full endpoint (after)", endpoint_lookup),
+        )
+        for name, call in paths:
+            wall, p99 = await burst(call, concurrency)
+            print(f"{concurrency:>11}  {name:<24} {wall * 1000:6.0f}ms {p99 * 1000:6.0f}ms {concurrency / wall:8.0f}")
+
+    await client.aclose()
+    await close_db_connection()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--latency-ms", type=float, default=50)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[10, 50, 200])
+    args = parser.parse_args()
+    asyncio.run(run(args.latency_ms / 1000, args.concurrency))
+
+
+if __name__ == "__main__":
+    main()
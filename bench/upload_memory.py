@@ -0,0 +1,121 @@
+"""
+Peak memory of one image upload, per storage backend.
+
+The GCS client talks to an in-process fake of the upload API, so no bucket or
+credentials are needed. Allocations are traced with tracemalloc, the peak is
+what a single upload adds on top of the already spooled request body.
+
+    python -m bench.upload_memory [--size-mb 4]
+"""
+import argparse
+import asyncio
+import base64
+import json
+import os
+import re
+import tempfile
+import tracemalloc
+
+import google_crc32c
+import requests
+from google.auth.credentials import AnonymousCredentials
+from google.cloud import storage
+
+from app.services.image_storage import UPLOAD_CHUNK_SIZE, GCSImageStorage, LocalImageStorage
+
+
+class FakeGCSAdapter(requests.adapters.BaseAdapter):
+    """Answers the multipart and resumable upload requests of the GCS JSON API"""
+
+    def __init__(self):
+        super().__init__()
+        self.requests = []
+        self.received = 0
+        self.checksum = google_crc32c.Checksum()
+
+    def send(self, request, **kwargs):
+        body = request.body or b""
+        self.requests.append((request.method, len(body)))
+        response = requests.Response()
+        response.request = request
+        response.url = request.url
+        response.headers["content-type"] = "application/json"
+        if request.method == "POST" and "uploadType=resumable" in request.url:
+            response.status_code = 200
+            response.headers["location"] = "https://fake.storage/upload?upload_id=1"
+            response._content = b""
+            return response
+        if request.method == "PUT":
+            self.received += len(body)
+            self.checksum.update(body)
+            content_range = request.headers.get("content-range", "")
+            if re.search(r"/\*$", content_range):
+                response.status_code = 308
+                response.headers["range"] = f"bytes=0-{self.received - 1}"
+                response._content = b""
+                return response
+        response.status_code = 200
+        crc32c = base64.b64encode(self.checksum.digest()).decode()
+        response._content = json.dumps({"name": "image", "bucket": "bench", "crc32c": crc32c}).encode()
+        return response
+
+    def close(self):
+        pass
+
+
+def spooled(size: int):
+    f = tempfile.SpooledTemporaryFile(max_size=1024 * 1024)
+    f.write(os.urandom(size))
+    f.seek(0)
+    return f
+
+
+def gcs_bucket():
+    adapter = FakeGCSAdapter()
+    session = requests.Session()
+    session.is_mtls = False
+    session.mount("https://", adapter)
+    client = storage.Client(project="bench", credentials=AnonymousCredentials(), _http=session)
+    return client.bucket("bench"), adapter
+
+
+def traced(call) -> int:
+    tracemalloc.start()
+    call()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--size-mb", type=float, default=4)
+    args = parser.parse_args()
+    size = int(args.size_mb * 1024 * 1024)
+
+    bucket, adapter = gcs_bucket()
+    source = spooled(size)
+    # What the upload did before it forced the resumable path
+    peak = traced(lambda: bucket.blob("a").upload_from_file(source, size=size, content_type="image/jpeg"))
+    print(f"gcs, size given (multipart)   peak {peak / 1024:8.0f} KB  requests {len(adapter.requests)}")
+
+    bucket, adapter = gcs_bucket()
+    source = spooled(size)
+    peak = traced(lambda: asyncio.run(GCSImageStorage(bucket).upload(source, "b", "image/jpeg", size=size)))
+    print(f"gcs, GCSImageStorage          peak {peak / 1024:8.0f} KB  requests {len(adapter.requests)}")
+
+    # Up to one chunk is sent in a single request
+    small = min(size, UPLOAD_CHUNK_SIZE)
+    bucket, adapter = gcs_bucket()
+    source = spooled(small)
+    peak = traced(lambda: asyncio.run(GCSImageStorage(bucket).upload(source, "d", "image/jpeg", size=small)))
+    print(f"gcs, GCSImageStorage {small / 1024:5.0f} KB peak {peak / 1024:8.0f} KB  requests {len(adapter.requests)}")
+
+    with tempfile.TemporaryDirectory() as root:
+        source = spooled(size)
+        peak = traced(lambda: asyncio.run(LocalImageStorage(root).upload(source, "c", "image/jpeg", size=size)))
+        print(f"local, LocalImageStorage      peak {peak / 1024:8.0f} KB")
+
+
+if __name__ == "__main__":
+    main()
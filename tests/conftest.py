@@ -0,0 +1,5 @@
+import os
+
+# Importing `app` needs these, the tests never reach the services behind them
+os.environ.setdefault("USER_SERVICE_URL", "http://user.local")
+os.environ.setdefault("JWT_SECRET", "test-secret")
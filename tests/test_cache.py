@@ -0,0 +1,124 @@
+import asyncio
+
+from app.utils.cache import AsyncTTLCache
+
+
+class Loader:
+    """Returns 1, 2, 3... and can be held until released"""
+
+    def __init__(self, delay: float = 0.0):
+        self.calls = 0
+        self.delay = delay
+        self.release = asyncio.Event()
+        self.release.set()
+
+    async def __call__(self):
+        self.calls += 1
+        value = self.calls
+        await self.release.wait()
+        await asyncio.sleep(self.delay)
+        return value
+
+
+async def test_concurrent_misses_share_one_load():
+    cache = AsyncTTLCache("test", maxsize=10, ttl=60)
+    loader = Loader(delay=0.01)
+
+    values = await asyncio.gather(*(cache.get_or_load("a", loader) for _ in range(10)))
+
+    assert values == [1] * 10
+    assert loader.calls == 1
+    assert cache.stats()["misses"] == 10
+    assert await cache.get_or_load("a", loader) == 1
+    assert cache.stats()["hits"] == 1
+
+
+async def test_load_started_before_invalidation_is_not_written_back():
+    cache = AsyncTTLCache("test", maxsize=10, ttl=60)
+    loader = Loader()
+    loader.release.clear()
+
+    before = asyncio.create_task(cache.get_or_load("a", loader))
+    await asyncio.sleep(0)
+    cache.invalidate("a")
+    after = asyncio.create_task(cache.get_or_load("a", loader))
+    await asyncio.sleep(0)
+    loader.release.set()
+
+    # The caller after the invalidation got its own load instead of joining the old one
+    assert await before == 1
+    assert await after == 2
+    assert loader.calls == 2
+    assert cache.get("a") == 2
+
+
+async def test_old_load_finishing_last_does_not_overwrite_newer_value():
+    cache = AsyncTTLCache("test", maxsize=10, ttl=60)
+    slow = Loader()
+    slow.release.clear()
+
+    before = asyncio.create_task(cache.get_or_load("a", slow))
+    await asyncio.sleep(0)
+    cache.invalidate("a")
+    assert await cache.get_or_load("a", Loader()) == 1
+
+    slow.release.set()
+    await before
+    assert cache.get("a") == 1
+
+
+async def test_clear_detaches_loads_in_flight():
+    cache = AsyncTTLCache("test", maxsize=10, ttl=60)
+    loader = Loader()
+    loader.release.clear()
+
+    pending = asyncio.create_task(cache.get_or_load("a", loader))
+    await asyncio.sleep(0)
+    cache.clear()
+    loader.release.set()
+    await pending
+
+    assert cache.get("a") is None
+    assert cache._inflight == {}
+
+
+async def test_stale_entry_is_served_while_refreshed_in_background():
+    cache = AsyncTTLCache("test", maxsize=10, ttl=0.05, stale_ttl=60)
+    loader = Loader()
+    await cache.get_or_load("a", loader)
+    await asyncio.sleep(0.06)
+
+    assert await cache.get_or_load("a", loader) == 1
+    assert cache.stats()["stale_hits"] == 1
+    await asyncio.sleep(0.001)
+    assert cache.get("a") == 2
+
+
+async def test_none_is_not_cached_and_failures_are_not_kept():
+    cache = AsyncTTLCache("test", maxsize=10, ttl=60)
+
+    async def missing():
+        return None
+
+    async def failing():
+        raise RuntimeError("down")
+
+    assert await cache.get_or_load("a", missing) is None
+    assert cache.get("a") is None
+    try:
+        await cache.get_or_load("b", failing)
+    except RuntimeError:
+        pass
+    assert cache._inflight == {}
+
+
+async def test_least_recently_used_entry_is_evicted():
+    cache = AsyncTTLCache("test", maxsize=2, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.stats()["size"] == 2
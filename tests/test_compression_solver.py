@@ -0,0 +1,89 @@
+import os
+from io import BytesIO
+
+from PIL import Image
+
+from app.services import image_service
+from app.services.image_service import MAX_ENCODE_ATTEMPTS, _CompressionSolver, _compress_image_sync
+
+
+def noisy_image(size=(256, 256), fmt="JPEG") -> bytes:
+    """Random pixels, which barely compress at any quality or scale above a few pixels"""
+    image = Image.frombytes("RGB", size, os.urandom(size[0] * size[1] * 3))
+    output = BytesIO()
+    image.save(output, format=fmt)
+    return output.getvalue()
+
+
+def count_encodes(monkeypatch, size: int | None = None):
+    """Record every encode, always returning size bytes when given"""
+    calls = []
+    encode = image_service._encode
+
+    def counting_encode(image, output_format, quality):
+        calls.append((image.size, output_format, quality))
+        if size is not None:
+            return b"x" * size
+        return encode(image, output_format, quality)
+
+    monkeypatch.setattr(image_service, "_encode", counting_encode)
+    return calls
+
+
+def test_fitting_image_is_encoded_once(monkeypatch):
+    calls = count_encodes(monkeypatch)
+
+    data, content_type = _compress_image_sync(noisy_image((32, 32)), 10 * 1024 * 1024)
+
+    assert content_type == "image/jpeg"
+    assert len(calls) == 1
+    assert Image.open(BytesIO(data)).size == (32, 32)
+
+
+def test_search_that_never_fits_stops_at_attempt_cap(monkeypatch):
+    # Just above the limit at every quality and scale, so neither search can narrow it down
+    calls = count_encodes(monkeypatch, size=1001)
+
+    data, content_type = _compress_image_sync(noisy_image(), 1000)
+
+    assert len(calls) == MAX_ENCODE_ATTEMPTS
+    assert len(data) == 1001
+    assert content_type == "image/jpeg"
+
+
+def test_png_that_never_fits_shares_attempt_cap_with_jpeg_fallback(monkeypatch):
+    calls = count_encodes(monkeypatch, size=1001)
+
+    data, content_type = _compress_image_sync(noisy_image(fmt="PNG"), 1000)
+
+    assert len(calls) == MAX_ENCODE_ATTEMPTS
+    assert len(data) == 1001
+    assert content_type == "image/jpeg"
+    formats = [fmt for _, fmt, _ in calls]
+    assert formats == ["PNG"] * (MAX_ENCODE_ATTEMPTS // 2) + ["JPEG"] * (MAX_ENCODE_ATTEMPTS // 2)
+
+
+def test_unreachable_size_returns_smallest_encode(monkeypatch):
+    calls = count_encodes(monkeypatch)
+
+    data, _ = _compress_image_sync(noisy_image(), 100)
+
+    assert 1 < len(calls) <= MAX_ENCODE_ATTEMPTS
+    assert Image.open(BytesIO(data)).size == min(size for size, _, _ in calls)
+
+
+def test_exhausted_solver_does_not_search():
+    image = Image.open(BytesIO(noisy_image((64, 64))))
+    solver = _CompressionSolver(image, 100)
+    solver.attempts = MAX_ENCODE_ATTEMPTS
+
+    assert solver.search_quality("JPEG", 10_000) is None
+    assert solver.search_scale("JPEG", 30, 10_000, 0.1) is None
+    assert solver.attempts == MAX_ENCODE_ATTEMPTS
+
+
+def test_unreachable_png_returns_jpeg_bytes():
+    data, content_type = _compress_image_sync(noisy_image(fmt="PNG"), 100)
+
+    assert content_type == "image/jpeg"
+    assert Image.open(BytesIO(data)).format == "JPEG"
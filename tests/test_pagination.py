@@ -0,0 +1,103 @@
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi import HTTPException
+from sqlmodel import Session, SQLModel, create_engine, select
+
+from app.models.po.item_user_po import ItemUser
+from app.utils.pagination import apply_keyset, decode_cursor, encode_cursor, keyset_page
+
+
+START = datetime(2024, 1, 1, 12, 0, 0)
+
+
+class Row:
+    def __init__(self, created_at: datetime, row_id: int):
+        self.created_at = created_at
+        self.id = row_id
+
+
+def rows(count: int) -> list[Row]:
+    return [Row(START - timedelta(minutes=i), count - i) for i in range(count)]
+
+
+@pytest.fixture
+def session():
+    engine = create_engine("sqlite://")
+    SQLModel.metadata.create_all(engine, tables=[ItemUser.__table__])
+    with Session(engine) as session:
+        # Rows 3 and 4 share a timestamp, the id breaks the tie
+        created = [START, START + timedelta(minutes=1), START + timedelta(minutes=2),
+                   START + timedelta(minutes=2), START + timedelta(minutes=3)]
+        for i, created_at in enumerate(created, start=1):
+            session.add(ItemUser(id=i, item_id=f"item-{i}", user_id="user", created_at=created_at))
+        session.commit()
+        yield session
+    engine.dispose()
+
+
+def test_cursor_round_trip():
+    created_at = datetime(2024, 5, 6, 7, 8, 9, 123456)
+
+    assert decode_cursor(encode_cursor(created_at, 42)) == (created_at, 42)
+
+
+@pytest.mark.parametrize("cursor", ["not a cursor", "", encode_cursor(START, 1)[:-4], "WyJ4Il0="])
+def test_invalid_cursor_is_a_bad_request(cursor):
+    with pytest.raises(HTTPException) as error:
+        decode_cursor(cursor)
+
+    assert error.value.status_code == 400
+
+
+def test_keyset_page_without_limit_returns_everything():
+    fetched = rows(3)
+
+    assert keyset_page(fetched, None) == (fetched, None)
+
+
+@pytest.mark.parametrize("limit", [0, -1])
+def test_keyset_page_with_no_room_is_empty(limit):
+    assert keyset_page(rows(3), limit) == ([], None)
+
+
+def test_keyset_page_that_fits_has_no_next_cursor():
+    page, next_cursor = keyset_page(rows(3), 3)
+
+    assert len(page) == 3
+    assert next_cursor is None
+
+
+def test_keyset_page_with_extra_row_points_at_last_row():
+    fetched = rows(4)
+
+    page, next_cursor = keyset_page(fetched, 3)
+
+    assert page == fetched[:3]
+    assert decode_cursor(next_cursor) == (fetched[2].created_at, fetched[2].id)
+
+
+def test_apply_keyset_fetches_one_extra_row():
+    statement = apply_keyset(select(ItemUser), ItemUser, 10, None)
+
+    assert statement._limit == 11
+
+
+@pytest.mark.parametrize("limit", [0, -5])
+def test_apply_keyset_never_uses_a_negative_limit(limit):
+    statement = apply_keyset(select(ItemUser), ItemUser, limit, None)
+
+    assert statement._limit == 1
+
+
+def test_apply_keyset_pages_through_ties_in_order(session):
+    seen = []
+    cursor = None
+    while True:
+        statement = apply_keyset(select(ItemUser), ItemUser, 2, cursor)
+        page, cursor = keyset_page(session.exec(statement).all(), 2)
+        seen.extend(row.id for row in page)
+        if cursor is None:
+            break
+
+    assert seen == [5, 4, 3, 2, 1]
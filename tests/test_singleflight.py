@@ -0,0 +1,111 @@
+import asyncio
+
+import pytest
+
+from app.utils.singleflight import SingleFlight, get_single_flight_stats, single_flight
+
+
+class Fetch:
+    """Counts calls and holds them until released"""
+
+    def __init__(self, result=None, error: Exception | None = None):
+        self.calls = []
+        self.result = result
+        self.error = error
+        self.release = asyncio.Event()
+
+    async def __call__(self, **kwargs):
+        self.calls.append(kwargs)
+        await self.release.wait()
+        if self.error is not None:
+            raise self.error
+        return self.result
+
+
+async def test_concurrent_calls_share_one_call():
+    group = SingleFlight("test")
+    fetch = Fetch(result="value")
+
+    waiters = [asyncio.create_task(group.do("a", fetch)) for _ in range(5)]
+    await asyncio.sleep(0)
+    fetch.release.set()
+
+    assert await asyncio.gather(*waiters) == ["value"] * 5
+    assert len(fetch.calls) == 1
+    assert group.stats() == {"calls": 5, "collapsed": 4, "inflight": 0}
+
+
+async def test_different_keys_are_not_collapsed():
+    group = SingleFlight("test")
+    fetch = Fetch(result="value")
+    fetch.release.set()
+
+    await asyncio.gather(group.do("a", fetch), group.do("b", fetch))
+
+    assert len(fetch.calls) == 2
+
+
+async def test_nothing_is_kept_after_completion():
+    group = SingleFlight("test")
+    fetch = Fetch(result="value")
+    fetch.release.set()
+
+    await group.do("a", fetch)
+    await group.do("a", fetch)
+
+    assert len(fetch.calls) == 2
+    assert group.stats()["inflight"] == 0
+
+
+async def test_exception_is_raised_to_every_caller():
+    group = SingleFlight("test")
+    fetch = Fetch(error=ValueError("upstream down"))
+
+    waiters = [asyncio.create_task(group.do("a", fetch)) for _ in range(3)]
+    await asyncio.sleep(0)
+    fetch.release.set()
+    results = await asyncio.gather(*waiters, return_exceptions=True)
+
+    assert len(fetch.calls) == 1
+    assert all(isinstance(result, ValueError) for result in results)
+    assert group.stats()["inflight"] == 0
+
+
+async def test_cancelled_caller_does_not_cancel_shared_call():
+    group = SingleFlight("test")
+    fetch = Fetch(result="value")
+
+    first = asyncio.create_task(group.do("a", fetch))
+    second = asyncio.create_task(group.do("a", fetch))
+    await asyncio.sleep(0)
+    first.cancel()
+    await asyncio.sleep(0)
+    fetch.release.set()
+
+    assert await second == "value"
+    with pytest.raises(asyncio.CancelledError):
+        await first
+    assert len(fetch.calls) == 1
+
+
+async def test_single_flight_keys_by_client_and_arguments():
+    fetch = Fetch(result="value")
+    wrapped = single_flight("test_keys", fetch)
+    client, other_client = object(), object()
+
+    waiters = [
+        asyncio.create_task(wrapped(client=client, ids=["a", "b"])),
+        asyncio.create_task(wrapped(client=client, ids=["a", "b"])),
+        asyncio.create_task(wrapped(client=client, ids=["a", "c"])),
+        asyncio.create_task(wrapped(client=other_client, ids=["a", "b"])),
+    ]
+    await asyncio.sleep(0)
+    fetch.release.set()
+    await asyncio.gather(*waiters)
+
+    assert fetch.calls == [
+        {"client": client, "ids": ["a", "b"]},
+        {"client": client, "ids": ["a", "c"]},
+        {"client": other_client, "ids": ["a", "b"]},
+    ]
+    assert get_single_flight_stats()["test_keys"]["collapsed"] == 1